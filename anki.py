@@ -1,12 +1,29 @@
+from __future__ import annotations
+
 import unicodedata
 from typing import Optional
-import base64
 import os
-import requests
-from typing import List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple
 from words import HebrewWord, PartOfSpeech
-from audio import prepare_audio
+from audio import download_audios, prepare_audio
+from media import MediaManifest
+from snapshot import (
+    DeckSnapshot,
+    fields_changed,
+    hash_tags,
+    note_state,
+    note_state_from_info,
+)
 from serial import get_note_id_from_word
+import metrics
+import profiling
+from util import lazy_import
+
+asyncio = lazy_import("asyncio")
+requests = lazy_import("requests")
+urllib3 = lazy_import("urllib3")
 
 ANKI_CONNECT_URL = "http://localhost:8765"
 
@@ -14,23 +31,197 @@ ANKI_CONNECT_URL = "http://localhost:8765"
 MODEL_AUDIO = "HebrewWordModelAudio"
 MODEL_NO_AUDIO = "HebrewWordModelNoAudio"
 
+MULTI_CHUNK_SIZE = 100  # actions per "multi" request
+NOTES_INFO_CHUNK_SIZE = 500
+
+
+def chunked(seq: List, size: int) -> List[List]:
+    return [seq[i : i + size] for i in range(0, len(seq), size)]
+
+
+class AnkiConnectClient:
+    """
+    Keeps one HTTP session to AnkiConnect so requests reuse a connection.
+    Failed connections and 502/503/504s are retried with exponential backoff.
+    The session is opened on first use, so creating a client is free.
+
+    """
+
+    def __init__(
+        self,
+        url: str = ANKI_CONNECT_URL,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_size: int = 4,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        with self._session_lock:
+            if self._session is None:
+                self._session = self._make_session()
+            return self._session
+
+    def _make_session(self) -> requests.Session:
+        session = requests.Session()
+        retry = urllib3.util.retry.Retry(
+            total=self.retries,
+            connect=self.retries,
+            read=0,  # the action may already have been applied
+            status=self.retries,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=None,
+            backoff_factor=self.backoff_factor,
+        )
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_size,
+            pool_maxsize=self.pool_size,
+            max_retries=retry,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def invoke(self, action, **params):
+        metrics.inc("anki_requests_total", action=action)
+        with metrics.timer("anki_request_seconds", action=action):
+            response = self.session.post(
+                self.url,
+                json={"action": action, "version": 6, "params": params},
+                timeout=self.timeout,
+            ).json()
+        if response.get("error"):
+            raise Exception(f"AnkiConnect error: {response['error']}")
+        return response["result"]
+
+    def invoke_multi(
+        self, actions: List[dict], chunk_size: int = MULTI_CHUNK_SIZE
+    ) -> List[Tuple[object, Optional[str]]]:
+        """
+        Runs [{"action": ..., "params": {...}}, ...] through AnkiConnect's "multi",
+        chunk_size actions per request. Returns (result, error) per action, in order.
+
+        """
+        outcomes = []
+        if metrics.is_enabled():
+            for action in actions:
+                metrics.inc("anki_multi_actions_total", action=action["action"])
+        for chunk in chunked(actions, chunk_size):
+            responses = self.invoke(
+                "multi",
+                actions=[
+                    {"action": a["action"], "version": 6, "params": a.get("params", {})}
+                    for a in chunk
+                ],
+            )
+            for response in responses:
+                if isinstance(response, dict) and "error" in response:
+                    outcomes.append((response.get("result"), response["error"]))
+                else:
+                    outcomes.append((response, None))
+        return outcomes
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncAnkiConnectClient(AnkiConnectClient):
+    """
+    Sends independent actions as concurrent requests over the pooled session
+    (up to max_in_flight at a time) instead of packing them into one "multi".
+    Each request is still a blocking requests call, run on a worker thread by
+    asyncio.to_thread. invoke_multi has the same contract, so either client
+    can be passed to the functions below, also from a notebook whose event
+    loop is already running; from async code, await gather() directly.
+
+    """
+
+    def __init__(self, *args, max_in_flight: int = 4, **kwargs):
+        super().__init__(*args, pool_size=max_in_flight, **kwargs)
+        self.max_in_flight = max_in_flight
+
+    async def invoke_async(self, action, **params):
+        """invoke on a worker thread, so the event loop isn't blocked."""
+        return await asyncio.to_thread(self.invoke, action, **params)
+
+    async def gather(self, actions: List[dict]) -> List[Tuple[object, Optional[str]]]:
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def run(action: dict):
+            async with semaphore:
+                try:
+                    result = await self.invoke_async(
+                        action["action"], **action.get("params", {})
+                    )
+                    return result, None
+                except Exception as e:
+                    return None, str(e)
+
+        return list(await asyncio.gather(*(run(a) for a in actions)))
+
+    def invoke_multi(
+        self, actions: List[dict], chunk_size: int = MULTI_CHUNK_SIZE
+    ) -> List[Tuple[object, Optional[str]]]:
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.gather(actions))
+        # asyncio.run can't nest inside a running loop (e.g. Jupyter's), so
+        # the gather gets its own loop on a helper thread
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self.gather(actions)).result()
+
+
+default_client = AnkiConnectClient()
+
 
 def invoke(action, **params):
-    response = requests.post(
-        ANKI_CONNECT_URL, json={"action": action, "version": 6, "params": params}
-    ).json()
-    if response.get("error"):
-        raise Exception(f"AnkiConnect error: {response['error']}")
-    return response["result"]
+    return default_client.invoke(action, **params)
 
 
-def ensure_deck_exists(deck_name: str):
-    if deck_name not in invoke("deckNames"):
-        invoke("createDeck", deck=deck_name)
+def invoke_multi(
+    actions: List[dict],
+    chunk_size: int = MULTI_CHUNK_SIZE,
+    client: Optional[AnkiConnectClient] = None,
+) -> List[Tuple[object, Optional[str]]]:
+    return (client or default_client).invoke_multi(actions, chunk_size)
 
 
-def ensure_models_exist():
-    existing_models = invoke("modelNames")
+def ensure_deck_exists(
+    deck_name: str,
+    existing_decks: Optional[List[str]] = None,
+    client: Optional[AnkiConnectClient] = None,
+):
+    client = client or default_client
+    if existing_decks is None:
+        existing_decks = client.invoke("deckNames")
+    if deck_name not in existing_decks:
+        client.invoke("createDeck", deck=deck_name)
+
+
+def ensure_models_exist(
+    existing_models: Optional[List[str]] = None,
+    client: Optional[AnkiConnectClient] = None,
+):
+    client = client or default_client
+    if existing_models is None:
+        existing_models = client.invoke("modelNames")
 
     fields = [
         {"name": "Word"},
@@ -94,7 +285,7 @@ def ensure_models_exist():
 """
 
     if MODEL_AUDIO not in existing_models:
-        invoke(
+        client.invoke(
             "createModel",
             modelName=MODEL_AUDIO,
             inOrderFields=[f["name"] for f in fields],
@@ -104,7 +295,7 @@ def ensure_models_exist():
         )
 
     if MODEL_NO_AUDIO not in existing_models:
-        invoke(
+        client.invoke(
             "createModel",
             modelName=MODEL_NO_AUDIO,
             inOrderFields=[f["name"] for f in fields],
@@ -114,14 +305,15 @@ def ensure_models_exist():
         )
 
 
-def reset_deck(deck_name: str):
+def reset_deck(deck_name: str, client: Optional[AnkiConnectClient] = None):
     """Deletes all notes from the specified Anki deck."""
-    note_ids = invoke("findNotes", query=f'deck:"{deck_name}"')
+    client = client or default_client
+    note_ids = client.invoke("findNotes", query=f'deck:"{deck_name}"')
     if not note_ids:
         print(f"✅ Deck '{deck_name}' is already empty.")
         return
 
-    invoke("deleteNotes", notes=note_ids)
+    client.invoke("deleteNotes", notes=note_ids)
     print(f"🧹 Deleted {len(note_ids)} notes from deck '{deck_name}'.")
 
 
@@ -142,20 +334,26 @@ def get_tags_from_word(word: HebrewWord) -> List[str]:
     return tags
 
 
-def get_note_by_guid(guid: str) -> Optional[dict]:
-    note_ids = invoke("findNotes", query=f"InternalGUID:{guid}")
+def get_note_by_guid(
+    guid: str, client: Optional[AnkiConnectClient] = None
+) -> Optional[dict]:
+    client = client or default_client
+    note_ids = client.invoke("findNotes", query=f"InternalGUID:{guid}")
     if not note_ids:
         return None
-    notes = invoke("notesInfo", notes=note_ids)
+    notes = client.invoke("notesInfo", notes=note_ids)
     return notes[0] if notes else None
 
 
-def get_notes_in_deck(deck_name: str) -> dict[str, dict]:
-    note_ids = invoke("findNotes", query=f'deck:"{deck_name}"')
+def get_notes_in_deck(
+    deck_name: str, client: Optional[AnkiConnectClient] = None
+) -> dict[str, dict]:
+    client = client or default_client
+    note_ids = client.invoke("findNotes", query=f'deck:"{deck_name}"')
     if not note_ids:
         return {}
 
-    notes = invoke("notesInfo", notes=note_ids)
+    notes = client.invoke("notesInfo", notes=note_ids)
 
     notes_by_internal_guid = {}
     for note in notes:
@@ -173,8 +371,8 @@ def get_model_name(note: dict) -> str:
     return note.get("modelName", "")
 
 
-def delete_note(note_id: int):
-    invoke("deleteNotes", notes=[note_id])
+def delete_note(note_id: int, client: Optional[AnkiConnectClient] = None):
+    (client or default_client).invoke("deleteNotes", notes=[note_id])
 
 
 def get_fields(word: HebrewWord, audio_field: str):
@@ -191,6 +389,49 @@ def get_fields(word: HebrewWord, audio_field: str):
     }
 
 
+def build_note(
+    word: HebrewWord, deck_name: str, guid: str, model: str, audio_tag=None
+) -> dict:
+    return {
+        "deckName": deck_name,
+        "modelName": model,
+        "fields": get_fields(word, audio_field=audio_tag or ""),
+        "tags": get_tags_from_word(word),
+        "options": {"allowDuplicate": True},
+        "guid": guid,
+    }
+
+
+def store_media_params(audio_path: str) -> dict:
+    # AnkiConnect reads the file itself, so nothing is base64-encoded in memory
+    return {
+        "filename": os.path.basename(audio_path),
+        "path": os.path.abspath(audio_path),
+    }
+
+
+def get_anki_media_files(client: Optional[AnkiConnectClient] = None) -> set:
+    client = client or default_client
+    return set(client.invoke("getMediaFilesNames", pattern="*.mp3"))
+
+
+def store_media_file(
+    audio_path: str,
+    manifest: MediaManifest,
+    anki_files: Optional[set] = None,
+    client: Optional[AnkiConnectClient] = None,
+) -> None:
+    """Uploads audio_path unless Anki already has this exact content."""
+    if not manifest.needs_upload(audio_path, anki_files):
+        return
+    (client or default_client).invoke(
+        "storeMediaFile", **store_media_params(audio_path)
+    )
+    manifest.mark_uploaded(audio_path)
+    if anki_files is not None:
+        anki_files.add(os.path.basename(audio_path))
+
+
 def add_note_to_anki(
     word: HebrewWord,
     deck_name: str,
@@ -198,25 +439,21 @@ def add_note_to_anki(
     model: str,
     audio_path=None,
     audio_tag=None,
+    client: Optional[AnkiConnectClient] = None,
+    manifest: Optional[MediaManifest] = None,
+    anki_files: Optional[set] = None,
 ):
-    fields = get_fields(word, audio_field=audio_tag or "")
-
+    """A manifest passed in belongs to the caller, who saves it when done."""
+    client = client or default_client
     # Upload audio to Anki media collection BEFORE creating the note
     if audio_path:
-        with open(audio_path, "rb") as f:
-            audio_data = base64.b64encode(f.read()).decode("utf-8")
-        invoke("storeMediaFile", filename=os.path.basename(audio_path), data=audio_data)
-
-    note = {
-        "deckName": deck_name,
-        "modelName": model,
-        "fields": fields,
-        "tags": get_tags_from_word(word),
-        "options": {"allowDuplicate": True},
-        "guid": guid,
-    }
+        own_manifest = manifest is None
+        manifest = manifest or MediaManifest()
+        store_media_file(audio_path, manifest, anki_files, client=client)
+        if own_manifest:
+            manifest.save()
 
-    invoke("addNote", note=note)
+    client.invoke("addNote", note=build_note(word, deck_name, guid, model, audio_tag))
 
 
 def normalize_str(s: str) -> str:
@@ -231,18 +468,351 @@ def fields_differ(existing_fields, new_fields) -> bool:
     )
 
 
-def delete_notes_by_guid(guids_to_delete: List[str], all_notes: Dict[str, dict]):
+def delete_notes_by_guid(
+    guids_to_delete: List[str],
+    all_notes: Dict[str, dict],
+    client: Optional[AnkiConnectClient] = None,
+):
     """Deletes notes using their GUIDs and the full note dict."""
     note_ids_to_delete = [
         note["noteId"] for guid, note in all_notes.items() if guid in guids_to_delete
     ]
     if note_ids_to_delete:
-        invoke("deleteNotes", notes=note_ids_to_delete)
+        (client or default_client).invoke("deleteNotes", notes=note_ids_to_delete)
+
+
+def get_notes_by_guids(
+    guids: set, client: Optional[AnkiConnectClient] = None
+) -> Dict[str, dict]:
+    """One findNotes for every InternalGUID in the collection, then notesInfo in chunks."""
+    client = client or default_client
+    note_ids = client.invoke("findNotes", query="InternalGUID:_*")
+    outcomes = client.invoke_multi(
+        [
+            {"action": "notesInfo", "params": {"notes": chunk}}
+            for chunk in chunked(note_ids, NOTES_INFO_CHUNK_SIZE)
+        ]
+    )
 
+    notes_by_guid = {}
+    for notes, error in outcomes:
+        if error:
+            raise Exception(f"AnkiConnect error: {error}")
+        for note in notes:
+            guid = note.get("fields", {}).get("InternalGUID", {}).get("value")
+            if guid in guids:
+                notes_by_guid[guid] = note
+    return notes_by_guid
+
+
+def prepare_words(
+    words: List[HebrewWord], failed: Dict[str, HebrewWord]
+) -> Dict[str, Tuple[HebrewWord, Tuple[Optional[str], Optional[str]]]]:
+    """guid -> (word, (audio_path, audio_tag)); repeated words are kept once."""
+    download_audios(words)
+    planned = {}
+    for word in words:
+        guid = str(get_note_id_from_word(word))
+        if guid in planned:
+            continue
+        try:
+            planned[guid] = (word, prepare_audio(word))
+        except Exception:
+            failed[guid] = word
+    return planned
 
-def upload_words_to_anki(words: List[HebrewWord], deck_name: str) -> List[HebrewWord]:
-    ensure_models_exist()
-    ensure_deck_exists(deck_name)
+
+def plan_media(
+    plan: dict,
+    guid: str,
+    audio_path: Optional[str],
+    manifest: MediaManifest,
+    anki_files: Optional[set] = None,
+) -> None:
+    if audio_path and (
+        audio_path in plan["media"] or manifest.needs_upload(audio_path, anki_files)
+    ):
+        # audio path -> guids waiting on it
+        plan["media"].setdefault(audio_path, []).append(guid)
+
+
+def plan_sync(
+    planned: Dict[str, tuple],
+    states: Dict[str, dict],
+    deck_name: str,
+    manifest: MediaManifest,
+    failed: Dict[str, HebrewWord],
+    anki_files: Optional[set] = None,
+) -> dict:
+    """
+    The add/update/model-switch decisions of upload_words_to_anki, made against
+    note states (see snapshot.note_state) rather than live notes.
+
+    """
+    plan = {"media": {}, "deletions": [], "adds": [], "updates": []}
+    for guid, (word, (audio_path, audio_tag)) in planned.items():
+        state = states.get(guid)
+        has_audio_now = word.path_to_audio is not None and word.path_to_audio != ""
+        try:
+            if state is None or (has_audio_now and state["model"] != MODEL_AUDIO):
+                if state is not None:
+                    # Switch model to audio, regardless of field match
+                    plan["deletions"].append((guid, state["note_id"]))
+                plan_media(plan, guid, audio_path, manifest, anki_files)
+                model = MODEL_AUDIO if has_audio_now else MODEL_NO_AUDIO
+                plan["adds"].append(
+                    (guid, build_note(word, deck_name, guid, model, audio_tag))
+                )
+                continue
+
+            new_fields = get_fields(
+                word, audio_field=audio_tag if has_audio_now else state["audio"]
+            )
+            new_tags = get_tags_from_word(word)
+            if fields_changed(state, new_fields) or state["tags"] != hash_tags(
+                new_tags
+            ):
+                if has_audio_now and audio_tag != state["audio"]:
+                    # The note now points at a file Anki may not hold yet
+                    plan_media(plan, guid, audio_path, manifest, anki_files)
+                plan["updates"].append(
+                    (
+                        guid,
+                        state["note_id"],
+                        new_fields,
+                        list(set(new_tags)),
+                        state["model"],
+                    )
+                )
+        except Exception:
+            failed[guid] = word
+    return plan
+
+
+def plan_is_empty(plan: dict) -> bool:
+    return not any(plan.values())
+
+
+def apply_plan(
+    plan: dict,
+    planned: Dict[str, tuple],
+    failed: Dict[str, HebrewWord],
+    manifest: MediaManifest,
+    client: AnkiConnectClient,
+    chunk_size: int = MULTI_CHUNK_SIZE,
+) -> Dict[str, dict]:
+    """
+    Sends a plan as chunked "multi" requests: media, then deletions, then adds,
+    then field/tag updates. Failures land in failed, and a note that failed an
+    earlier step skips the later ones; returns the new state of every note that
+    was deleted (None), added or updated.
+
+    """
+
+    def run(tagged_actions: List[Tuple[str, dict]]) -> List[Tuple[object, str]]:
+        outcomes = client.invoke_multi(
+            [action for _, action in tagged_actions], chunk_size
+        )
+        for (guid, _), (_, error) in zip(tagged_actions, outcomes):
+            if error and guid in planned:
+                failed[guid] = planned[guid][0]
+        return outcomes
+
+    changed: Dict[str, Optional[dict]] = {}
+
+    # Upload audio to Anki media collection BEFORE creating the notes,
+    # once per file however many notes share it
+    media = plan["media"]
+    media_paths = list(media)
+    outcomes = run(
+        [
+            (
+                media[path][0],
+                {"action": "storeMediaFile", "params": store_media_params(path)},
+            )
+            for path in media_paths
+        ]
+    )
+    for path, (_, error) in zip(media_paths, outcomes):
+        if error:
+            for guid in media[path]:
+                failed[guid] = planned[guid][0]
+        else:
+            manifest.mark_uploaded(path)
+    manifest.save()
+
+    # A model switch whose audio didn't upload keeps its old note
+    deletions = [delete for delete in plan["deletions"] if delete[0] not in failed]
+    outcomes = run(
+        [
+            (guid, {"action": "deleteNotes", "params": {"notes": [note_id]}})
+            for guid, note_id in deletions
+        ]
+    )
+    for (guid, _), (_, error) in zip(deletions, outcomes):
+        if not error:
+            changed[guid] = None
+
+    adds = [(guid, note) for guid, note in plan["adds"] if guid not in failed]
+    outcomes = run(
+        [(guid, {"action": "addNote", "params": {"note": note}}) for guid, note in adds]
+    )
+    for (guid, note), (note_id, error) in zip(adds, outcomes):
+        if not error:
+            changed[guid] = note_state(
+                note_id, note["modelName"], note["fields"], note["tags"]
+            )
+
+    updates = [update for update in plan["updates"] if update[0] not in failed]
+    outcomes = run(
+        [
+            action
+            for guid, note_id, new_fields, new_tags, _ in updates
+            for action in (
+                (
+                    guid,
+                    {
+                        "action": "updateNoteFields",
+                        "params": {"note": {"id": note_id, "fields": new_fields}},
+                    },
+                ),
+                (
+                    guid,
+                    {
+                        "action": "updateNoteTags",
+                        "params": {"note": note_id, "tags": new_tags},
+                    },
+                ),
+            )
+        ]
+    )
+    for i, (guid, note_id, new_fields, new_tags, model) in enumerate(updates):
+        if not outcomes[2 * i][1] and not outcomes[2 * i + 1][1]:
+            changed[guid] = note_state(note_id, model, new_fields, new_tags)
+
+    return changed
+
+
+def upload_words_to_anki_bulk(
+    words: List[HebrewWord],
+    deck_name: str,
+    chunk_size: int = MULTI_CHUNK_SIZE,
+    client: Optional[AnkiConnectClient] = None,
+) -> List[HebrewWord]:
+    """
+    Same decisions as upload_words_to_anki, but notes are looked up all at once
+    and changes go out as chunked "multi" requests (see apply_plan). Words
+    whose action fails are returned, like upload_words_to_anki does.
+
+    """
+    client = client or default_client
+    (existing_models, _), (existing_decks, _), (anki_files, _) = client.invoke_multi(
+        [
+            {"action": "modelNames"},
+            {"action": "deckNames"},
+            {"action": "getMediaFilesNames", "params": {"pattern": "*.mp3"}},
+        ]
+    )
+    anki_files = set(anki_files or [])
+    manifest = MediaManifest()
+    ensure_models_exist(existing_models, client=client)
+    ensure_deck_exists(deck_name, existing_decks, client=client)
+
+    failed = {}
+    with profiling.stage("prepare"):
+        planned = prepare_words(words, failed)
+    with profiling.stage("fetch_notes"):
+        states = {
+            guid: note_state_from_info(note)
+            for guid, note in get_notes_by_guids(set(planned), client=client).items()
+        }
+    with profiling.stage("plan"):
+        plan = plan_sync(planned, states, deck_name, manifest, failed, anki_files)
+    with profiling.stage("apply"):
+        apply_plan(plan, planned, failed, manifest, client, chunk_size)
+
+    return list(failed.values())
+
+
+def sync_deck(
+    words: List[HebrewWord],
+    deck_name: str,
+    delete_missing: bool = False,
+    refresh: bool = False,
+    chunk_size: int = MULTI_CHUNK_SIZE,
+    client: Optional[AnkiConnectClient] = None,
+) -> List[HebrewWord]:
+    """
+    Incremental upload_words_to_anki. The plan is computed offline against the
+    deck's DeckSnapshot, and Anki is only contacted when something changed.
+    The snapshot is built from the deck the first time, or when refresh=True
+    (use that after editing notes in Anki by hand). delete_missing also removes
+    notes whose words are no longer in the list.
+
+    """
+    client = client or default_client
+    snapshot = None if refresh else DeckSnapshot.load(deck_name)
+    if snapshot is None:
+        snapshot = DeckSnapshot(
+            deck_name,
+            {
+                guid: note_state_from_info(note)
+                for guid, note in get_notes_in_deck(deck_name, client=client).items()
+            },
+        )
+        snapshot.save()
+
+    failed = {}
+    manifest = MediaManifest()
+    with profiling.stage("prepare"):
+        planned = prepare_words(words, failed)
+    with profiling.stage("plan"):
+        plan = plan_sync(planned, snapshot.notes, deck_name, manifest, failed)
+    if delete_missing:
+        missing = [guid for guid in snapshot.notes if guid not in planned]
+        if missing:
+            print(f"🗑️ Deleting {len(missing)} notes no longer present in word list.")
+        plan["deletions"] += [
+            (guid, snapshot.notes[guid]["note_id"]) for guid in missing
+        ]
+
+    if plan_is_empty(plan):
+        return list(failed.values())
+
+    (existing_models, _), (existing_decks, _) = client.invoke_multi(
+        [{"action": "modelNames"}, {"action": "deckNames"}]
+    )
+    ensure_models_exist(existing_models, client=client)
+    ensure_deck_exists(deck_name, existing_decks, client=client)
+
+    with profiling.stage("apply"):
+        changed = apply_plan(plan, planned, failed, manifest, client, chunk_size)
+    for guid, state in changed.items():
+        if state is None:
+            snapshot.notes.pop(guid, None)
+        else:
+            snapshot.notes[guid] = state
+    snapshot.save()
+
+    return list(failed.values())
+
+
+def upload_words_to_anki(
+    words: List[HebrewWord],
+    deck_name: str,
+    bulk: bool = False,
+    client: Optional[AnkiConnectClient] = None,
+) -> List[HebrewWord]:
+    if bulk:
+        return upload_words_to_anki_bulk(words, deck_name, client=client)
+
+    client = client or default_client
+    ensure_models_exist(client=client)
+    ensure_deck_exists(deck_name, client=client)
+    manifest = MediaManifest()
+    anki_files = get_anki_media_files(client)
+    with profiling.stage("download_audio"):
+        download_audios(words)
 
     # existing_notes = get_notes_in_deck(deck_name)
     # existing_guids = set(existing_notes.keys())
@@ -252,7 +822,8 @@ def upload_words_to_anki(words: List[HebrewWord], deck_name: str) -> List[Hebrew
     for word in words:
         try:
             guid = get_note_id_from_word(word)
-            note = get_note_by_guid(guid)
+            with profiling.stage("fetch_notes"):
+                note = get_note_by_guid(guid, client=client)
             # current_guids.add(guid)
             has_audio_now = word.path_to_audio is not None and word.path_to_audio != ""
 
@@ -276,38 +847,62 @@ def upload_words_to_anki(words: List[HebrewWord], deck_name: str) -> List[Hebrew
 
                 if has_audio_now and not is_audio_model:
                     # Switch model to audio, regardless of field match
-                    delete_note(note["noteId"])
+                    delete_note(note["noteId"], client=client)
                     add_note_to_anki(
-                        word, deck_name, guid, MODEL_AUDIO, audio_path, audio_tag
+                        word,
+                        deck_name,
+                        guid,
+                        MODEL_AUDIO,
+                        audio_path,
+                        audio_tag,
+                        client=client,
+                        manifest=manifest,
+                        anki_files=anki_files,
                     )
 
                 elif (has_audio_now and is_audio_model) or (
                     not has_audio_now and not is_audio_model
                 ):
                     if fields_changed or tags_changed:
-                        invoke(
+                        if has_audio_now and new_audio_value != audio_to_keep:
+                            # The note now points at a file Anki may not hold yet
+                            store_media_file(
+                                audio_path, manifest, anki_files, client=client
+                            )
+                        client.invoke(
                             "updateNoteFields",
                             note={"id": note["noteId"], "fields": new_fields},
                         )
-                        invoke(
+                        client.invoke(
                             "updateNoteTags", note=note["noteId"], tags=list(new_tags)
                         )
 
                 elif not has_audio_now and is_audio_model:
                     if fields_changed or tags_changed:
-                        invoke(
+                        client.invoke(
                             "updateNoteFields",
                             note={"id": note["noteId"], "fields": new_fields},
                         )
-                        invoke(
+                        client.invoke(
                             "updateNoteTags", note=note["noteId"], tags=list(new_tags)
                         )
             else:
                 # Create new note
                 model = MODEL_AUDIO if has_audio_now else MODEL_NO_AUDIO
-                add_note_to_anki(word, deck_name, guid, model, audio_path, audio_tag)
+                add_note_to_anki(
+                    word,
+                    deck_name,
+                    guid,
+                    model,
+                    audio_path,
+                    audio_tag,
+                    client=client,
+                    manifest=manifest,
+                    anki_files=anki_files,
+                )
         except Exception as e:
             failed_words.append(word)
+    manifest.save()
     return failed_words
     # # Batch delete notes that are no longer present
     # to_delete = list(existing_guids - current_guids)
@@ -1,12 +1,20 @@
-import requests
+from __future__ import annotations
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 import re
+import shutil
 from serial import get_note_id_from_word
 from words import HebrewWord
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict
 import os
 import urllib.parse
-from util import yes_or_no_input
+from util import lazy_import, yes_or_no_input
 from dataclasses import replace
+import metrics
+
+requests = lazy_import("requests")
+urllib3 = lazy_import("urllib3")
 
 
 def add_audios(lst: List[HebrewWord]) -> List[HebrewWord]:
@@ -39,32 +47,118 @@ def get_audio(
     return url
 
 
-def download_audio(word: HebrewWord, audio_dir="resources/audio") -> Optional[str]:
-    if not word.path_to_audio:
-        return None
+AUDIO_DIRECTORY = "resources/audio"
+DOWNLOAD_TIMEOUT = 30  # seconds
+DOWNLOAD_WORKERS = 8
+CHUNK_SIZE = 1 << 16
 
-    os.makedirs(audio_dir, exist_ok=True)
 
-    # Deterministic filename based on note ID
+def get_audio_session(pool_size: int = DOWNLOAD_WORKERS) -> requests.Session:
+    session = requests.Session()
+    retry = urllib3.util.retry.Retry(
+        total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)
+    )
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_legacy_audio_path(word: HebrewWord, audio_dir=AUDIO_DIRECTORY) -> str:
+    # Files used to be named per note, so each meaning had its own copy
     note_id = get_note_id_from_word(word)
     safe_word = re.sub(r"[^\w\-א-ת]", "", word.word)  # Remove problematic chars
     filename = f"{safe_word}_{note_id}.mp3"
-    output_path = os.path.join(audio_dir, filename)
+    return os.path.join(audio_dir, filename)
+
+
+def get_audio_path(word: HebrewWord, audio_dir=AUDIO_DIRECTORY) -> str:
+    """
+    Audio is stored once per source URL: every note whose path_to_audio is the
+    same TTS URL shares one file. The spoken text is kept in the name for
+    readability, the URL hash makes it unique.
+
+    """
+    url = word.path_to_audio or ""
+    spoken = urllib.parse.parse_qs(urllib.parse.urlparse(url).query).get("q", [""])[0]
+    safe_text = re.sub(r"[^\w\-א-ת]", "", spoken or word.word)[:40]
+    url_hash = hashlib.sha256(url.encode()).hexdigest()[:16]
+    return os.path.join(audio_dir, f"{safe_text}_{url_hash}.mp3")
+
+
+def fetch_to_file(
+    url: str, output_path: str, session: Optional[requests.Session] = None
+) -> bool:
+    """
+    Streams url into output_path + ".part" and renames it into place only once
+    complete, so output_path never exists half-written. A .part left over from
+    an interrupted run is resumed with a Range request when the server allows.
+
+    """
+    session = session or requests
+    part_path = f"{output_path}.part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+    with session.get(
+        url, headers=headers, stream=True, timeout=DOWNLOAD_TIMEOUT
+    ) as response:
+        if response.status_code == 416 and offset:
+            # Nothing can be sent from offset, e.g. the .part is already
+            # complete but was never renamed: start over without it
+            os.remove(part_path)
+            return fetch_to_file(url, output_path, session)
+        if response.status_code not in (200, 206):
+            print(f"Failed to download {url}: status {response.status_code}")
+            return False
+        # 200 means the server ignored the Range header: start over
+        mode = "ab" if response.status_code == 206 else "wb"
+        written = 0
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+                written += len(chunk)
+        metrics.inc("audio_bytes_downloaded_total", written)
+
+    os.replace(part_path, output_path)
+    return True
+
+
+def download_audio(
+    word: HebrewWord,
+    audio_dir=AUDIO_DIRECTORY,
+    session: Optional[requests.Session] = None,
+) -> Optional[str]:
+    if not word.path_to_audio:
+        return None
+
+    os.makedirs(audio_dir, exist_ok=True)
+
+    output_path = get_audio_path(word, audio_dir)
 
     # If file already exists, no need to redownload
     if os.path.exists(output_path):
         return output_path
 
+    legacy_path = get_legacy_audio_path(word, audio_dir)
+    if word.path_to_audio.startswith("http") and os.path.exists(legacy_path):
+        # Legacy files are committed and other notes may still name them: link
+        # or copy, never move
+        try:
+            os.link(legacy_path, output_path)
+        except FileExistsError:
+            pass
+        except OSError:
+            shutil.copyfile(legacy_path, output_path)
+        return output_path
+
     # Download if it's a URL
     if word.path_to_audio.startswith("http"):
         try:
-            response = requests.get(word.path_to_audio)
-            if response.status_code == 200:
-                with open(output_path, "wb") as f:
-                    f.write(response.content)
+            if fetch_to_file(word.path_to_audio, output_path, session):
                 return output_path
-            else:
-                print(f"Failed to download audio for {word.word}: status {response.status_code}")
         except Exception as e:
             print(f"Error downloading audio for {word.word}: {e}")
     else:
@@ -77,6 +171,40 @@ def download_audio(word: HebrewWord, audio_dir="resources/audio") -> Optional[st
     return None
 
 
+def download_audios(
+    words: List[HebrewWord],
+    audio_dir=AUDIO_DIRECTORY,
+    max_workers: int = DOWNLOAD_WORKERS,
+) -> List[Optional[str]]:
+    """
+    download_audio for many words at once on a thread pool sharing one session.
+    Returns the paths in the order of words; each file is fetched at most once.
+
+    """
+    by_path: Dict[str, HebrewWord] = {}
+    for word in words:
+        if word.path_to_audio and word.path_to_audio.startswith("http"):
+            by_path.setdefault(get_audio_path(word, audio_dir), word)
+    missing = [word for path, word in by_path.items() if not os.path.exists(path)]
+
+    if missing:
+        session = get_audio_session(max_workers)
+        with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(
+                executor.map(
+                    lambda word: download_audio(word, audio_dir, session), missing
+                )
+            )
+
+    paths = []
+    for word in words:
+        if word.path_to_audio and word.path_to_audio.startswith("http"):
+            path = get_audio_path(word, audio_dir)
+            paths.append(path if os.path.exists(path) else None)
+        else:
+            paths.append(download_audio(word, audio_dir))
+    return paths
+
 
 def prepare_audio(word: HebrewWord) -> tuple[Optional[str], Optional[str]]:
     audio_path = download_audio(word)
@@ -85,4 +213,4 @@ def prepare_audio(word: HebrewWord) -> tuple[Optional[str], Optional[str]]:
         audio_basename = os.path.basename(audio_path)
         audio_tag = f"[sound:{audio_basename}]"
         return audio_path.replace("\\", "/"), audio_tag
-    return None, None
\ No newline at end of file
+    return None, None
@@ -0,0 +1,426 @@
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import fields
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from anki import fields_differ, get_fields, get_tags_from_word, upload_words_to_anki
+from fake_anki import FakeAnkiClient
+from hebrew_processing import find_variations
+from serial import (
+    COLS,
+    _insert_rows,
+    batched_writes,
+    check_cache,
+    from_dataframe,
+    from_dataframe_rowwise,
+    get_cache_connection,
+    memory_cache,
+    to_dataframe,
+    write_cache,
+)
+from translator import clean_word_preserving_internals, count_tokens
+from words import Binyaan, PartOfSpeech
+
+HEBREW_LETTERS = "אבגדהוזחטיכלמנסעפצקרשת"
+
+# Milliseconds to import each module in a fresh interpreter, about twice what
+# they take once the heavy dependencies are lazy
+IMPORT_BUDGETS_MS = {
+    "util": 10,
+    "metrics": 10,
+    "profiling": 20,
+    "hebrew_processing": 10,
+    "words": 50,
+    "serial": 80,
+    "media": 20,
+    "snapshot": 20,
+    "audio": 100,
+    "lexicon": 60,
+    "translator": 100,
+    "anki": 100,
+    "selection": 100,
+}
+# None of these should be loaded by importing the modules above
+HEAVY_MODULES = ("pandas", "numpy", "requests", "bs4", "selenium", "urllib3")
+IMPORT_CHECK = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = [name for name in {heavy!r} if name in sys.modules]
+print(elapsed, *loaded)
+"""
+
+
+def random_hebrew(rng: random.Random, length: int) -> str:
+    return "".join(rng.choice(HEBREW_LETTERS) for _ in range(length))
+
+
+def make_cache_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic cache with the same column layout and string encoding as the store."""
+    rng = random.Random(seed)
+    records = []
+    for _ in range(rows):
+        pos = rng.choice(list(PartOfSpeech))
+        record = {
+            "word": random_hebrew(rng, rng.randint(2, 7)),
+            "meaning": f"meaning {rng.randint(0, 10**6)}",
+            "transliteration": f"t{rng.randint(0, 10**6)}",
+            "menukad": random_hebrew(rng, 5),
+            "part_of_speech": str(pos),
+            "root": " - ".join(random_hebrew(rng, 3)),
+        }
+        if pos in (PartOfSpeech.NOUN, PartOfSpeech.ADJECTIVE):
+            record["gender"] = rng.choice(["masculine", "feminine"])
+            record["number"] = rng.choice(["singular", "plural"])
+        if pos is PartOfSpeech.VERB:
+            record["binyan"] = str(rng.choice(list(Binyaan)))
+            record["tense"] = rng.choice(["past", "present", "future"])
+        records.append(record)
+    return pd.DataFrame(records).reindex(columns=COLS)
+
+
+def timed(fn: Callable, *args, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_from_dataframe(rows: int = 100_000) -> dict:
+    df = make_cache_frame(rows)
+    rowwise = timed(from_dataframe_rowwise, df, repeat=1)
+    bulk = timed(from_dataframe, df)
+    return {
+        "rows": rows,
+        "rowwise_s": rowwise,
+        "bulk_s": bulk,
+        "speedup": rowwise / bulk,
+    }
+
+
+def bench_cache(rows: int, queries: int = 200, writes: int = 200) -> dict:
+    """check_cache and write_cache against a store already holding rows words."""
+    df = make_cache_frame(rows)
+    rng = random.Random(1)
+    hits = rng.sample(list(df["word"]), min(queries, rows))
+    misses = [random_hebrew(rng, 9) for _ in range(queries)]
+    new_words = from_dataframe(make_cache_frame(2 * writes, seed=2))
+
+    with tempfile.TemporaryDirectory() as directory:
+        file = os.path.join(directory, "cache.csv")
+        _insert_rows(get_cache_connection(file), df)
+
+        def lookup(words):
+            memory_cache.clear()
+            for word in words:
+                check_cache(word, file=file)
+
+        def write_each(words):
+            for word in words:
+                write_cache([word], file=file)
+
+        def write_batched(words):
+            with batched_writes(file):
+                for word in words:
+                    write_cache([word], file=file)
+
+        result = {
+            "rows": rows,
+            "check_hit_s": timed(lookup, hits) / len(hits),
+            "check_miss_s": timed(lookup, misses) / len(misses),
+            "write_each_s": timed(write_each, new_words[:writes], repeat=1) / writes,
+            "write_batched_s": timed(write_batched, new_words[writes:], repeat=1)
+            / writes,
+        }
+        get_cache_connection(file).close()
+    return result
+
+
+def bench_dataframe(rows: int = 100_000) -> dict:
+    df = make_cache_frame(rows)
+    words = from_dataframe(df)
+    return {
+        "rows": rows,
+        "from_dataframe_s": timed(from_dataframe, df),
+        "to_dataframe_s": timed(to_dataframe, words),
+    }
+
+
+def double_yud_word(rng: random.Random, yuds: int) -> str:
+    return "וה" + "".join(random_hebrew(rng, 2) + "יי" for _ in range(yuds))
+
+
+def bench_find_variations(yuds: int = 8, words: int = 200) -> dict:
+    rng = random.Random(3)
+    sample = [double_yud_word(rng, yuds) for _ in range(words)]
+    find_variations(sample[0])  # loads the frequency list
+
+    def run(sample):
+        for word in sample:
+            find_variations(word)
+
+    return {
+        "yuds": yuds,
+        "words": words,
+        "variations": len(find_variations(sample[0])),
+        "find_variations_s": timed(run, sample) / words,
+    }
+
+
+def make_text(tokens: int, seed: int = 4) -> str:
+    rng = random.Random(seed)
+    punctuation = ["", "", "", ",", ".", "!", "?", "…", '"', "״", ":"]
+    return " ".join(
+        rng.choice(punctuation)
+        + random_hebrew(rng, rng.randint(2, 7))
+        + rng.choice(punctuation)
+        for _ in range(tokens)
+    )
+
+
+def bench_clean_words(tokens: int = 1_000_000) -> dict:
+    text = make_text(tokens)
+    lines = text.split(" ")  # one token per line for the streaming path
+
+    def clean(text):
+        for word in text.split():
+            clean_word_preserving_internals(word)
+
+    return {
+        "tokens": tokens,
+        "clean_s": timed(clean, text),
+        "count_tokens_s": timed(count_tokens, lines),
+    }
+
+
+def bench_note_building(words: int = 100_000) -> dict:
+    sample = from_dataframe(make_cache_frame(words, seed=5))
+    existing = [get_fields(word, "") for word in sample]
+
+    def build(sample):
+        for word in sample:
+            get_fields(word, "")
+
+    def tags(sample):
+        for word in sample:
+            get_tags_from_word(word)
+
+    def differ(sample):
+        for word, fields in zip(sample, existing):
+            fields_differ(fields, get_fields(word, ""))
+
+    return {
+        "words": words,
+        "get_fields_s": timed(build, sample),
+        "get_tags_from_word_s": timed(tags, sample),
+        "fields_differ_s": timed(differ, sample),
+    }
+
+
+def bench_upload(words: int = 1000, bulk: bool = False) -> dict:
+    """
+    upload_words_to_anki into an empty deck, then again with nothing changed,
+    against an in-process FakeAnki. Words carry no audio, so nothing is
+    downloaded.
+
+    """
+    sample = from_dataframe(make_cache_frame(words, seed=6))
+    client = FakeAnkiClient()
+
+    start = time.perf_counter()
+    upload_words_to_anki(sample, "Benchmark", bulk=bulk, client=client)
+    first = time.perf_counter() - start
+    first_requests = client.backend.requests
+
+    start = time.perf_counter()
+    upload_words_to_anki(sample, "Benchmark", bulk=bulk, client=client)
+    again = time.perf_counter() - start
+
+    return {
+        "words": words,
+        "bulk": bulk,
+        "first_upload_s": first,
+        "first_upload_requests": first_requests,
+        "resync_s": again,
+        "resync_requests": client.backend.requests - first_requests,
+    }
+
+
+def deep_size(words: List) -> int:
+    """Bytes held by words: the instances, any __dict__, and each distinct string once."""
+    total = sys.getsizeof(words)
+    seen = set()
+    for word in words:
+        total += sys.getsizeof(word)
+        if hasattr(word, "__dict__"):
+            total += sys.getsizeof(word.__dict__)
+        for value in (getattr(word, f.name) for f in fields(word)):
+            if type(value) is str and id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+    return total
+
+
+def bench_word_memory(words: int = 1_000_000) -> dict:
+    # A CSV round trip gives every value its own string object, like loading the cache
+    df = pd.read_csv(io.StringIO(make_cache_frame(words, seed=8).to_csv(index=False)))
+    start = time.perf_counter()
+    sample = from_dataframe(df)
+    build = time.perf_counter() - start
+    del df
+    size = deep_size(sample)
+    return {
+        "words": words,
+        "build_s": build,
+        "bytes": size,
+        "bytes_per_word": size / words,
+    }
+
+
+def bench_imports(repeat: int = 5) -> dict:
+    """
+    Median import time of every module in IMPORT_BUDGETS_MS, each in a fresh
+    interpreter, and the heavy modules it actually loaded.
+
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    results = {}
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        script = IMPORT_CHECK.format(module=module, heavy=HEAVY_MODULES)
+        times = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", script],
+                capture_output=True,
+                text=True,
+                check=True,
+                cwd=directory,
+            ).stdout.split()
+            times.append(float(output[0]) * 1000)
+        import_ms = sorted(times)[len(times) // 2]
+        results[module] = {
+            "import_ms": import_ms,
+            "budget_ms": budget,
+            "heavy_loaded": output[1:],
+        }
+    return results
+
+
+def over_budget(results: Dict[str, dict]) -> List[str]:
+    return [
+        module
+        for module, result in results.items()
+        if result["import_ms"] > result["budget_ms"] or result["heavy_loaded"]
+    ]
+
+
+def run_suite(quick: bool = False) -> Dict[str, dict]:
+    cache_sizes = [1000, 100_000] if quick else [1000, 100_000, 1_000_000]
+    scale = 10 if quick else 1
+    cases = {f"cache_{rows}": (bench_cache, (rows,)) for rows in cache_sizes}
+    cases |= {
+        "imports": (bench_imports, ()),
+        "from_dataframe": (bench_from_dataframe, (100_000 // scale,)),
+        "dataframe": (bench_dataframe, (100_000 // scale,)),
+        "find_variations": (bench_find_variations, (8, 200 // scale)),
+        "clean_words": (bench_clean_words, (1_000_000 // scale,)),
+        "note_building": (bench_note_building, (100_000 // scale,)),
+        "upload": (bench_upload, (1000 // scale, False)),
+        "upload_bulk": (bench_upload, (1000 // scale, True)),
+        "word_memory": (bench_word_memory, (1_000_000 // scale,)),
+    }
+    results = {}
+    for name, (bench, args) in cases.items():
+        start = time.perf_counter()
+        results[name] = bench(*args)
+        print(f"{name}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.25) -> List[str]:
+    """
+    Timings (keys ending in _s) of cases present in both reports. Returns the
+    ones more than tolerance slower than the baseline.
+
+    """
+    regressions = []
+    for case, metrics in current["results"].items():
+        before = baseline["results"].get(case, {})
+        for key, value in metrics.items():
+            if not key.endswith("_s") or not before.get(key):
+                continue
+            ratio = value / before[key]
+            flag = ""
+            if ratio > 1 + tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{case}.{key}")
+            print(
+                f"{case}.{key}: {before[key]:.3g}s -> {value:.3g}s ({ratio:.2f}x){flag}"
+            )
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks, reported as JSON.")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes")
+    parser.add_argument("--output", help="write the report to this file")
+    parser.add_argument("--compare", help="baseline report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument(
+        "--imports", action="store_true", help="only check import-time budgets"
+    )
+    args = parser.parse_args()
+
+    if args.imports:
+        results = bench_imports()
+        for module, result in results.items():
+            heavy = ", ".join(result["heavy_loaded"])
+            print(
+                f"{module}: {result['import_ms']:.0f}ms of {result['budget_ms']}ms"
+                + (f", loaded {heavy}" if heavy else "")
+            )
+        sys.exit(1 if over_budget(results) else 0)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "quick": args.quick,
+        "results": run_suite(args.quick),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    else:
+        print(json.dumps(report, indent=1))
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(baseline, report, args.tolerance):
+            sys.exit(1)
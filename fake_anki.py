@@ -0,0 +1,209 @@
+import itertools
+import json
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+from anki import AnkiConnectClient
+
+
+class FakeAnki:
+    """
+    In-memory stand-in for the part of AnkiConnect this project uses: decks,
+    models, notes (found by deck or InternalGUID), media names and "multi".
+    Counts requests and actions so benchmarks can report round trips.
+
+    """
+
+    def __init__(self):
+        self.decks: set = {"Default"}
+        self.models: Dict[str, List[str]] = {}
+        self.notes: Dict[int, dict] = {}
+        self.media: set = set()
+        self.requests = 0
+        self.actions: Counter = Counter()
+        self._ids = itertools.count(1_000_000_000)
+        self._lock = threading.Lock()
+
+    def request(self, payload: dict) -> dict:
+        """One AnkiConnect request body in, one response body out."""
+        with self._lock:
+            self.requests += 1
+            return self._respond(payload["action"], payload.get("params", {}))
+
+    def _respond(self, action: str, params: dict) -> dict:
+        try:
+            return {"result": self.handle(action, params), "error": None}
+        except Exception as e:
+            return {"result": None, "error": str(e)}
+
+    def handle(self, action: str, params: dict):
+        self.actions[action] += 1
+        handler = getattr(self, f"_{action}", None)
+        if handler is None:
+            raise Exception(f"unsupported action: {action}")
+        return handler(**params)
+
+    def _multi(self, actions: List[dict]) -> List[dict]:
+        return [self._respond(a["action"], a.get("params", {})) for a in actions]
+
+    def _version(self) -> int:
+        return 6
+
+    def _deckNames(self) -> List[str]:
+        return sorted(self.decks)
+
+    def _createDeck(self, deck: str) -> int:
+        self.decks.add(deck)
+        return len(self.decks)
+
+    def _modelNames(self) -> List[str]:
+        return list(self.models)
+
+    def _createModel(self, modelName: str, inOrderFields: List[str], **_) -> dict:
+        if modelName in self.models:
+            raise Exception(f"Model name already exists: {modelName}")
+        self.models[modelName] = inOrderFields
+        return {"name": modelName}
+
+    def _findNotes(self, query: str) -> List[int]:
+        if match := re.fullmatch(r'deck:"(.*)"', query):
+            return [i for i, n in self.notes.items() if n["deckName"] == match[1]]
+        if match := re.fullmatch(r"InternalGUID:(.*)", query):
+            value = match[1]
+            if value == "_*":
+                return [i for i, n in self.notes.items() if n["fields"]["InternalGUID"]]
+            return [
+                i for i, n in self.notes.items() if n["fields"]["InternalGUID"] == value
+            ]
+        raise Exception(f"unsupported query: {query}")
+
+    def _notesInfo(self, notes: List[int]) -> List[dict]:
+        return [self._info(note_id) for note_id in notes if note_id in self.notes]
+
+    def _info(self, note_id: int) -> dict:
+        note = self.notes[note_id]
+        return {
+            "noteId": note_id,
+            "modelName": note["modelName"],
+            "tags": list(note["tags"]),
+            "fields": {
+                name: {"value": value, "order": order}
+                for order, (name, value) in enumerate(note["fields"].items())
+            },
+        }
+
+    def _addNote(self, note: dict) -> int:
+        model = self.models.get(note["modelName"])
+        if model is None:
+            raise Exception(f"model was not found: {note['modelName']}")
+        if note["deckName"] not in self.decks:
+            raise Exception(f"deck was not found: {note['deckName']}")
+        note_id = next(self._ids)
+        self.notes[note_id] = {
+            "deckName": note["deckName"],
+            "modelName": note["modelName"],
+            "fields": {name: note["fields"].get(name, "") for name in model},
+            "tags": list(note.get("tags", [])),
+        }
+        return note_id
+
+    def _updateNoteFields(self, note: dict) -> None:
+        self._note(note["id"])["fields"].update(note["fields"])
+
+    def _updateNoteTags(self, note: int, tags: List[str]) -> None:
+        self._note(note)["tags"] = list(tags)
+
+    def _deleteNotes(self, notes: List[int]) -> None:
+        for note_id in notes:
+            self.notes.pop(note_id, None)
+
+    def _note(self, note_id: int) -> dict:
+        if note_id not in self.notes:
+            raise Exception(f"note was not found: {note_id}")
+        return self.notes[note_id]
+
+    def _storeMediaFile(self, filename: str, **_) -> str:
+        self.media.add(filename)
+        return filename
+
+    def _getMediaFilesNames(self, pattern: str = "*") -> List[str]:
+        suffix = pattern.lstrip("*")
+        return [name for name in self.media if name.endswith(suffix)]
+
+
+class FakeAnkiClient(AnkiConnectClient):
+    """AnkiConnectClient that talks to a FakeAnki directly instead of over HTTP."""
+
+    def __init__(self, backend: Optional[FakeAnki] = None):
+        super().__init__()
+        self.backend = backend or FakeAnki()
+
+    def invoke(self, action, **params):
+        response = self.backend.request(
+            {"action": action, "version": 6, "params": params}
+        )
+        if response.get("error"):
+            raise Exception(f"AnkiConnect error: {response['error']}")
+        return response["result"]
+
+
+class FakeAnkiServer:
+    """
+    Serves a FakeAnki over HTTP on localhost, like AnkiConnect on port 8765,
+    from a background thread. latency seconds are slept before every response.
+    Point AnkiConnectClient(url=server.url) at it.
+
+    """
+
+    def __init__(
+        self,
+        backend: Optional[FakeAnki] = None,
+        latency: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.backend = backend or FakeAnki()
+        self.latency = latency
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if server.latency:
+                    time.sleep(server.latency)
+                response = server.backend.request(json.loads(body))
+                data = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAnkiServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
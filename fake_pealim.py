@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+FIXTURE_DIRECTORY = "resources/fixtures/pealim"
+NO_RESULTS_PAGE = (
+    '<!DOCTYPE html>\n<html lang="en"><head><meta charset="utf-8"></head>'
+    "<body><p>No results found.</p></body></html>\n"
+)
+
+
+class PealimFixtureServer:
+    """
+    Answers /search/?q=<word> with resources/fixtures/pealim/<word>.html, or a
+    page without results when there is no fixture. fallback names a fixture
+    to serve for every unknown word instead, so every lookup finds something.
+
+    """
+
+    def __init__(
+        self,
+        directory: str = FIXTURE_DIRECTORY,
+        latency: float = 0.0,
+        fallback: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.pages: Dict[str, bytes] = {}
+        for name in os.listdir(directory):
+            if name.endswith(".html"):
+                with open(os.path.join(directory, name), "rb") as f:
+                    self.pages[name[: -len(".html")]] = f.read()
+        self.default_page = (
+            self.pages[fallback] if fallback else NO_RESULTS_PAGE.encode()
+        )
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urllib.parse.urlparse(self.path)
+                query = urllib.parse.parse_qs(url.query).get("q", [""])[0]
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if url.path.rstrip("/") != "/search":
+                    self.send_error(404)
+                    return
+                page = server.pages.get(query, server.default_page)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                self.wfile.write(page)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def search_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/search/"
+
+    def start(self) -> "PealimFixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,5 +1,9 @@
-from util import remove_duplicates, powerset
-from typing import List
+import csv
+import os
+from functools import lru_cache
+from itertools import combinations
+from util import remove_duplicates
+from typing import Dict, List
 
 PREFIX_ORDER = [["ו"], ["ש", "כ", "ב", "ל", "מ"], ["ה"]]
 PREFIX_MEANINGS = {
@@ -13,22 +17,54 @@ PREFIX_MEANINGS = {
 }
 
 
-def find_variations(word: str) -> List[str]:
+FREQUENCY_LIST = "resources/frequency_list.csv"
+
+
+@lru_cache(maxsize=1)
+def get_frequency_ranks(path: str = FREQUENCY_LIST) -> Dict[str, int]:
+    """word -> best (lowest) rank in the frequency list, loaded once."""
+    ranks = {}
+    if not os.path.exists(path):
+        return ranks
+    with open(path, encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            word = row["word"]
+            rank = int(row["frequency_rank"])
+            if rank < ranks.get(word, rank + 1):
+                ranks[word] = rank
+    return ranks
+
+
+def rank_variations(stages: List[List[str]]) -> List[str]:
+    """
+    Flattens variations grouped by how many prefix letters were stripped,
+    fewest first, so a word is tried before the shorter words inside it
+    (מלך before לך). Within a group forms are ordered by frequency rank; forms
+    not in the list come last, and ties keep the original likelihood order.
+
+    """
+    ranks = get_frequency_ranks()
+    ranked = []
+    for stage in stages:
+        ranked.extend(sorted(stage, key=lambda v: ranks.get(v, float("inf"))))
+    return remove_duplicates(ranked)
+
+
+def find_variations(word: str, rank: bool = True) -> List[str]:
     """
     Returns a list (in decreasing likelihood) of variations of the word.
     Variations include trying to remove double yuds and trying to remove the prefixes.
     Not every word is guaranteed to be a real word or related to the meaning, as
     there are situations where the prefix is part of a word, and removing it results in 
-    a completely different word or nonsense. 
+    a completely different word or nonsense. The word itself always comes first,
+    then forms with fewer prefixes removed before forms with more; with rank,
+    forms that lost the same prefixes are ordered by frequency (see rank_variations).
 
     """
-    vars1 = remove_prefixes(word)
-
-    variations = [word]
-    for var in vars1:
-        variations = variations + find_double_yud(var)
-
-    return remove_duplicates(variations)
+    stages = [[word]] + [find_double_yud(var) for var in remove_prefixes(word)]
+    if rank:
+        return rank_variations(stages)
+    return remove_duplicates(var for stage in stages for var in stage)
 
 
 def find_double_yud(word: str, char="י") -> List[str]:
@@ -39,31 +75,26 @@ def find_double_yud(word: str, char="י") -> List[str]:
 
     """
     double_char = char * 2
-    results = []
+    # Split once; each variant is then a single join choosing, per gap,
+    # whether to keep the double yud or collapse it
+    parts = word.split(double_char)
+    gaps = range(len(parts) - 1)
 
-    where_doubles = []
-    for i in range(len(word)):
-        if word[i : i + 2] == double_char:
-            where_doubles.append(i)
-
-    for subset in powerset(where_doubles):
-        index = 0
-        new_word = word
-        for num in range(len(subset)):
-            loc_to_replace = subset[num] - num
-            while index <= loc_to_replace:
-                if index == loc_to_replace:
-                    assert new_word[index : index + 2] == double_char, print(
-                        index, word
-                    )
-                    new_word = new_word[:index] + char + new_word[index + 2 :]
-                index += 1
-        results.append(new_word)
+    results = []
+    for size in range(len(parts)):
+        for collapsed in combinations(gaps, size):
+            chosen = set(collapsed)
+            results.append(
+                parts[0]
+                + "".join(
+                    (char if gap in chosen else double_char) + parts[gap + 1]
+                    for gap in gaps
+                )
+            )
 
     return results
 
 
-
 def remove_prefixes(word: str) -> List[str]:
     """
     Outputs a list of words where the prefixes (if any) are removed sequentially.
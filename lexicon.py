@@ -0,0 +1,102 @@
+import csv
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+from hebrew_processing import FREQUENCY_LIST
+from words import HebrewWord, PartOfSpeech, POS_MAP, HEBREW_CLASS_MAP
+
+LEXICON_DB = "resources/lexicon.sqlite"
+LEXICON_SOURCES = [FREQUENCY_LIST]
+LEXICON_COLS = [
+    "word",
+    "meaning",
+    "transliteration",
+    "menukad",
+    "part_of_speech",
+    "root",
+]
+
+_connections: dict[str, sqlite3.Connection] = {}
+_lock = threading.Lock()
+
+
+def _is_stale(db_path: str, sources: List[str]) -> bool:
+    if not os.path.exists(db_path):
+        return True
+    built = os.path.getmtime(db_path)
+    return any(os.path.getmtime(src) > built for src in sources if os.path.exists(src))
+
+
+def build_lexicon(
+    db_path: str = LEXICON_DB, sources: Optional[List[str]] = None
+) -> int:
+    """
+    Indexes CSV word lists (frequency_list.csv layout: word, meaning,
+    transliteration, menukad, part_of_speech, root, optional frequency_rank)
+    into one SQLite file keyed on word. Returns the number of entries.
+
+    """
+    sources = sources if sources is not None else LEXICON_SOURCES
+    rows = []
+    for src in sources:
+        if not os.path.exists(src):
+            continue
+        with open(src, encoding="utf-8", newline="") as f:
+            for i, record in enumerate(csv.DictReader(f)):
+                rank = record.get("frequency_rank")
+                rows.append(
+                    tuple(record.get(col) or None for col in LEXICON_COLS)
+                    + (int(rank) if rank else i,)
+                )
+
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    with conn:
+        columns = ", ".join(f'"{col}" TEXT' for col in LEXICON_COLS)
+        conn.execute(f"CREATE TABLE entries ({columns}, rank INTEGER)")
+        placeholders = ", ".join("?" for _ in range(len(LEXICON_COLS) + 1))
+        conn.executemany(f"INSERT INTO entries VALUES ({placeholders})", rows)
+        conn.execute("CREATE INDEX idx_entries_word ON entries (word, rank)")
+    conn.close()
+    os.replace(tmp_path, db_path)
+    return len(rows)
+
+
+def get_lexicon_connection(db_path: str = LEXICON_DB) -> sqlite3.Connection:
+    with _lock:
+        conn = _connections.get(db_path)
+        if conn is None:
+            if _is_stale(db_path, LEXICON_SOURCES):
+                os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+                build_lexicon(db_path)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            _connections[db_path] = conn
+        return conn
+
+
+def parse_part_of_speech(value: Optional[str]) -> PartOfSpeech:
+    # Accept both "NOUN" and the cache's "PartOfSpeech.NOUN"
+    if not value:
+        return PartOfSpeech.WORD
+    return POS_MAP.get(value.split(".")[-1].upper(), PartOfSpeech.WORD)
+
+
+def lookup_lexicon(query: str, db_path: str = LEXICON_DB) -> List[HebrewWord]:
+    """Entries for query, most frequent sense first, as HebrewWord subclasses."""
+    conn = get_lexicon_connection(db_path)
+    columns = ", ".join(f'"{col}"' for col in LEXICON_COLS)
+    with _lock:
+        rows = conn.execute(
+            f"SELECT {columns} FROM entries WHERE word = ? ORDER BY rank", (query,)
+        ).fetchall()
+
+    results = []
+    for row in rows:
+        kwargs = dict(zip(LEXICON_COLS, row))
+        kwargs["part_of_speech"] = parse_part_of_speech(kwargs["part_of_speech"])
+        results.append(HEBREW_CLASS_MAP[kwargs["part_of_speech"]](**kwargs))
+    return results
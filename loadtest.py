@@ -0,0 +1,155 @@
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import translator
+from anki import AnkiConnectClient, upload_words_to_anki
+from benchmark import make_cache_frame, random_hebrew
+from fake_anki import FakeAnkiServer
+from fake_pealim import PealimFixtureServer
+from hebrew_processing import find_variations, get_frequency_ranks
+from rate_limit import TokenBucket
+from serial import from_dataframe
+
+
+def workload_words(count: int, seed: int = 0) -> List[str]:
+    """The most frequent words first, padded with random ones if the list is short."""
+    ranks = get_frequency_ranks()
+    words = sorted(ranks, key=ranks.get)[:count]
+    rng = random.Random(seed)
+    while len(words) < count:
+        words.append(random_hebrew(rng, rng.randint(2, 7)))
+    return words
+
+
+def replay_scrape(
+    words: List[str],
+    latency: float = 0.0,
+    fallback: Optional[str] = None,
+    workers: int = 4,
+    engine: str = "http",
+    driver=None,
+    rate_limiter: Optional[TokenBucket] = None,
+) -> dict:
+    """
+    Looks every word up the way find_options does (variations in order until
+    one has results) against a PealimFixtureServer, without the cache.
+    The rate limiter is off unless one is passed in. engine="selenium" needs
+    a driver.
+
+    """
+    errors = 0
+    found = 0
+    lock = threading.Lock()
+    saved = translator.PEALIM_SEARCH_URL, translator.PEALIM_RATE_LIMITER
+    with PealimFixtureServer(latency=latency, fallback=fallback) as server:
+        translator.PEALIM_SEARCH_URL = server.search_url
+        translator.PEALIM_RATE_LIMITER = rate_limiter or TokenBucket(
+            rate=1e9, capacity=10**9, empty_streak=10**9
+        )
+        client = driver or translator.get_http_session(pool_size=workers)
+
+        def lookup(word: str) -> None:
+            nonlocal errors, found
+            try:
+                for variation in find_variations(word):
+                    if translator.SCRAPERS[engine](
+                        variation, client, lookup_audio=False, check_audio=False
+                    ):
+                        with lock:
+                            found += 1
+                        return
+            except Exception:
+                with lock:
+                    errors += 1
+
+        start = time.perf_counter()
+        try:
+            if engine == "selenium":
+                for word in words:  # one browser can't be shared between threads
+                    lookup(word)
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    list(executor.map(lookup, words))
+        finally:
+            translator.PEALIM_SEARCH_URL, translator.PEALIM_RATE_LIMITER = saved
+        wall = time.perf_counter() - start
+
+    return {
+        "words": len(words),
+        "found": found,
+        "requests": server.requests,
+        "requests_per_word": server.requests / len(words),
+        "wall_s": wall,
+        "errors": errors,
+    }
+
+
+def replay_upload(words: int, latency: float = 0.0, bulk: bool = True) -> dict:
+    """
+    upload_words_to_anki of words synthetic notes into an empty deck over HTTP,
+    then a second pass with nothing changed.
+
+    """
+    sample = from_dataframe(make_cache_frame(words, seed=7))
+    report = {"words": words, "bulk": bulk}
+    with FakeAnkiServer(latency=latency) as server, AnkiConnectClient(
+        url=server.url
+    ) as client:
+        for run in ("first", "resync"):
+            requests_before = server.backend.requests
+            start = time.perf_counter()
+            try:
+                failed = upload_words_to_anki(
+                    sample, "LoadTest", bulk=bulk, client=client
+                )
+                errors = len(failed)
+            except Exception as e:
+                print(f"{run} upload failed: {e}")
+                errors = words
+            requests = server.backend.requests - requests_before
+            report[run] = {
+                "requests": requests,
+                "requests_per_word": requests / words,
+                "wall_s": time.perf_counter() - start,
+                "errors": errors,
+            }
+        report["notes"] = len(server.backend.notes)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Replays workloads against local AnkiConnect and pealim stand-ins."
+    )
+    parser.add_argument("--words", type=int, default=10_000)
+    parser.add_argument("--anki-latency", type=float, default=0.0)
+    parser.add_argument("--pealim-latency", type=float, default=0.0)
+    parser.add_argument(
+        "--fallback", help="fixture served for words without their own, e.g. חתול"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-word", action="store_true", help="upload without bulk")
+    parser.add_argument("--output", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = {
+        "scrape": replay_scrape(
+            workload_words(args.words),
+            latency=args.pealim_latency,
+            fallback=args.fallback,
+            workers=args.workers,
+        ),
+        "upload": replay_upload(
+            args.words, latency=args.anki_latency, bulk=not args.per_word
+        ),
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    else:
+        print(json.dumps(report, indent=1))
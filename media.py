@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from typing import Optional
+
+MEDIA_MANIFEST = "resources/audio/media_manifest.json"
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MediaManifest:
+    """
+    Remembers, per media filename, the content hash of the local file and the
+    hash last uploaded to Anki, so unchanged audio is never sent twice.
+    Hashes are only recomputed when a file's size or mtime changes.
+
+    """
+
+    def __init__(self, path: str = MEDIA_MANIFEST):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        self._dirty = False
+
+    def content_hash(self, file_path: str) -> str:
+        name = os.path.basename(file_path)
+        stat = os.stat(file_path)
+        entry = self.entries.setdefault(name, {})
+        if entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime:
+            entry.update(
+                size=stat.st_size, mtime=stat.st_mtime, hash=file_sha256(file_path)
+            )
+            self._dirty = True
+        return entry["hash"]
+
+    def needs_upload(self, file_path: str, anki_files: Optional[set] = None) -> bool:
+        """
+        anki_files, if given, is what Anki reports holding; a file missing there
+        is re-sent even if the manifest says it was uploaded.
+
+        """
+        name = os.path.basename(file_path)
+        if anki_files is not None and name not in anki_files:
+            return True
+        return self.entries.get(name, {}).get("uploaded") != self.content_hash(
+            file_path
+        )
+
+    def mark_uploaded(self, file_path: str) -> None:
+        name = os.path.basename(file_path)
+        self.entries[name]["uploaded"] = self.content_hash(file_path)
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
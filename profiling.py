@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from util import lazy_import
+
+# Only needed once a run starts
+cProfile = lazy_import("cProfile")
+pstats = lazy_import("pstats")
+tracemalloc = lazy_import("tracemalloc")
+
+PROFILE_DIRECTORY = "resources/profiles"
+TOP_FUNCTIONS = 25
+PROJECT_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+_active: Optional["Profiler"] = None
+
+
+class _Frame:
+    """An open stage or allocation scope."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start_bytes = tracemalloc.get_traced_memory()[0]
+        self.peak_bytes = self.start_bytes
+
+
+class Profiler:
+    """
+    cProfile and tracemalloc over one run, split into named stages. Each stage
+    has its own cProfile that only runs while it is the innermost open stage,
+    so its functions are the ones it spent time in itself. Only the thread
+    that opened the run is profiled; tracemalloc sees every thread.
+
+    """
+
+    def __init__(self, name: str = "run"):
+        self.name = name
+        self.stages: Dict[str, dict] = {}
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self.allocations: Dict[str, dict] = {}
+        self._stack: List[_Frame] = []
+        self._stages: List[str] = []
+        self._thread = threading.get_ident()
+        self._started_tracemalloc = False
+        self._run_stage = None
+
+    def _fold_peak(self) -> None:
+        # tracemalloc keeps one peak; spread it over every open frame before resetting
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame.peak_bytes = max(frame.peak_bytes, peak)
+        tracemalloc.reset_peak()
+
+    def _push(self, name: str) -> _Frame:
+        self._fold_peak()
+        frame = _Frame(name)
+        self._stack.append(frame)
+        return frame
+
+    def _pop(self) -> _Frame:
+        self._fold_peak()
+        return self._stack.pop()
+
+    def _switch_profile(self, old: Optional[str], new: Optional[str]) -> None:
+        if old is not None:
+            self.profiles[old].disable()
+        if new is not None:
+            self.profiles.setdefault(new, cProfile.Profile()).enable()
+
+    @contextmanager
+    def stage(self, name: str):
+        if threading.get_ident() != self._thread:
+            yield
+            return
+        outer = self._stages[-1] if self._stages else None
+        self._switch_profile(outer, name)
+        self._stages.append(name)
+        frame = self._push(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            self._pop()
+            self._stages.pop()
+            self._switch_profile(name, outer)
+            stats = self.stages.setdefault(
+                name,
+                {"calls": 0, "wall_s": 0.0, "peak_bytes": 0, "peak_growth_bytes": 0},
+            )
+            stats["calls"] += 1
+            stats["wall_s"] += wall
+            stats["peak_bytes"] = max(stats["peak_bytes"], frame.peak_bytes)
+            stats["peak_growth_bytes"] = max(
+                stats["peak_growth_bytes"], frame.peak_bytes - frame.start_bytes
+            )
+
+    @contextmanager
+    def track_allocations(self, name: str):
+        if threading.get_ident() != self._thread:
+            yield
+            return
+        frame = self._push(name)
+        try:
+            yield
+        finally:
+            self._pop()
+            net = tracemalloc.get_traced_memory()[0] - frame.start_bytes
+            stats = self.allocations.setdefault(
+                name, {"calls": 0, "net_bytes": 0, "peak_growth_bytes": 0}
+            )
+            stats["calls"] += 1
+            stats["net_bytes"] += net
+            stats["peak_growth_bytes"] = max(
+                stats["peak_growth_bytes"], frame.peak_bytes - frame.start_bytes
+            )
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self._run_stage = self.stage(self.name)
+        self._run_stage.__enter__()
+
+    def stop(self) -> None:
+        self._run_stage.__exit__(None, None, None)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def report(self, top: int = TOP_FUNCTIONS) -> dict:
+        stages = {
+            name: dict(stats, top_functions=top_functions(self.profiles[name], top))
+            for name, stats in self.stages.items()
+        }
+        overall = pstats.Stats(*self.profiles.values()) if self.profiles else None
+        return {
+            "name": self.name,
+            "python": sys.version.split()[0],
+            "stages": stages,
+            "allocations": self.allocations,
+            "top_functions": top_functions(overall, top) if overall else [],
+        }
+
+
+def _function_key(func: tuple) -> str:
+    filename, line, name = func
+    # Paths relative to the project (or the standard library), so reports from
+    # different checkouts line up
+    for base in (PROJECT_DIRECTORY, sys.prefix):
+        if filename.startswith(base):
+            filename = os.path.relpath(filename, base)
+            break
+    return f"{filename}:{line}({name})"
+
+
+def top_functions(profile, top: int = TOP_FUNCTIONS) -> List[dict]:
+    stats = profile if isinstance(profile, pstats.Stats) else pstats.Stats(profile)
+    rows = [
+        {
+            "function": _function_key(func),
+            "ncalls": ncalls,
+            "tottime_s": tottime,
+            "cumtime_s": cumtime,
+        }
+        for func, (_, ncalls, tottime, cumtime, _) in stats.stats.items()
+    ]
+    rows.sort(key=lambda row: row["cumtime_s"], reverse=True)
+    return rows[:top]
+
+
+@contextmanager
+def stage(name: str):
+    """Marks a pipeline stage in the active profile run; free when none is active."""
+    if _active is None:
+        yield
+        return
+    with _active.stage(name):
+        yield
+
+
+@contextmanager
+def track_allocations(name: str):
+    """Adds the memory a block allocates to the active run's allocation report."""
+    if _active is None:
+        yield
+        return
+    with _active.track_allocations(name):
+        yield
+
+
+def tracked(func):
+    """track_allocations around every call of func, under its name."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active is None:
+            return func(*args, **kwargs)
+        with _active.track_allocations(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def profile_run(name: str = "run", path: Optional[str] = None):
+    """
+    Profiles everything in the block, e.g. a translate_text or
+    upload_words_to_anki call, and writes the JSON report to path
+    (default resources/profiles/<name>.json).
+
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("A profile run is already active")
+    profiler = Profiler(name)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _active = None
+        path = path or os.path.join(PROFILE_DIRECTORY, f"{name}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(profiler.report(), f, indent=1)
+
+
+def compare_reports(before: dict, after: dict, top: int = 10) -> None:
+    """Prints stage time and memory side by side, then the functions that moved most."""
+    for name in after["stages"]:
+        old = before["stages"].get(name)
+        new = after["stages"][name]
+        if old is None:
+            print(f"{name}: new stage, {new['wall_s']:.3f}s")
+            continue
+        print(
+            f"{name}: {old['wall_s']:.3f}s -> {new['wall_s']:.3f}s, "
+            f"peak {old['peak_bytes'] / 1e6:.1f}MB -> {new['peak_bytes'] / 1e6:.1f}MB"
+        )
+    for name, new in after["allocations"].items():
+        old = before["allocations"].get(name, {"net_bytes": 0})
+        print(
+            f"{name}: net {old['net_bytes'] / 1e6:.1f}MB -> {new['net_bytes'] / 1e6:.1f}MB"
+        )
+
+    old_times = {row["function"]: row["cumtime_s"] for row in before["top_functions"]}
+    new_times = {row["function"]: row["cumtime_s"] for row in after["top_functions"]}
+    moved = sorted(
+        set(old_times) | set(new_times),
+        key=lambda f: abs(new_times.get(f, 0) - old_times.get(f, 0)),
+        reverse=True,
+    )
+    for function in moved[:top]:
+        print(
+            f"{old_times.get(function, 0):8.3f}s -> {new_times.get(function, 0):8.3f}s  {function}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python profiling.py BEFORE.json AFTER.json")
+    with open(sys.argv[1], encoding="utf-8") as f:
+        before = json.load(f)
+    with open(sys.argv[2], encoding="utf-8") as f:
+        after = json.load(f)
+    compare_reports(before, after)
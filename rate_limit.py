@@ -0,0 +1,107 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Shared rate limiter: up to capacity requests go out back to back, after
+    that one every 1/rate seconds. A 429/5xx, or empty_streak empty results
+    in a row, pauses everyone for a backoff that doubles while the trouble
+    lasts and resets on the next good response. Requests queued during a pause
+    go out one every 1/rate seconds after it.
+
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        capacity: int = 3,
+        initial_backoff: float = 5.0,
+        max_backoff: float = 120.0,
+        backoff_factor: float = 2.0,
+        empty_streak: int = 10,
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.backoff_factor = backoff_factor
+        self.empty_streak = empty_streak
+
+        self._lock = threading.Lock()
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._backoff = 0.0
+        self._empties = 0
+        self._throttled = False
+
+    def acquire(self) -> float:
+        """Blocks until a request may go out; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            # No tokens accrue during a pause: _updated sits at its end
+            self._tokens = min(
+                self.capacity,
+                self._tokens + max(0.0, now - self._updated) * self.rate,
+            )
+            self._updated = max(self._updated, now)
+            # Going negative reserves a future token, so waiters queue up fairly
+            self._tokens -= 1
+            wait = max(0.0, self._blocked_until - now) + max(
+                0.0, -self._tokens / self.rate
+            )
+
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    @property
+    def backing_off(self) -> bool:
+        """
+        True from a 429/5xx until the server answers normally again, even with
+        an empty page. An empty streak pauses requests but doesn't set this,
+        since searching for words pealim doesn't have looks the same.
+
+        """
+        with self._lock:
+            return self._throttled
+
+    def _penalize(self, retry_after: Optional[float] = None) -> None:
+        self._backoff = min(
+            self.max_backoff,
+            (
+                self._backoff * self.backoff_factor
+                if self._backoff
+                else self.initial_backoff
+            ),
+        )
+        delay = max(self._backoff, retry_after or 0.0)
+        self._blocked_until = time.monotonic() + delay
+        self._updated = max(self._updated, self._blocked_until)
+        self._tokens = min(self._tokens, 0.0)
+        print(f"Rate limiter backing off for {delay:.1f}s")
+
+    def report(
+        self,
+        status: Optional[int] = None,
+        empty: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        """Feeds back how a request went. status is None when it isn't known (Selenium)."""
+        with self._lock:
+            if status is not None and (status == 429 or status >= 500):
+                self._throttled = True
+                self._penalize(retry_after)
+                return
+            if status is not None:
+                self._throttled = False
+            if empty:
+                self._empties += 1
+                if self._empties >= self.empty_streak:
+                    self._empties = 0
+                    self._penalize()
+            else:
+                self._empties = 0
+                self._backoff = 0.0
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+from serial import from_dataframe, record_selection
+from translator import choose_option, iter_translations, ScraperPool
+from util import lazy_import
+from words import HebrewWord, PartOfSpeech
+
+pd = lazy_import("pandas")
+
+REVIEW_QUEUE = "resources/review_queue.jsonl"
+
+# A policy narrows a word's options; select() applies them in turn
+Policy = Callable[[List[HebrewWord]], List[HebrewWord]]
+
+
+def is_construct(option: HebrewWord) -> bool:
+    # pealim lists smichut forms as e.g. "חֲתוּל־" / "chatul-" / "cat of ..."
+    return (
+        (option.meaning or "").endswith("of ...")
+        or (option.menukad or "").endswith("־")
+        or (option.transliteration or "").endswith("-")
+    )
+
+
+def first(options: List[HebrewWord]) -> List[HebrewWord]:
+    return options[:1]
+
+
+def non_construct(options: List[HebrewWord]) -> List[HebrewWord]:
+    return [option for option in options if not is_construct(option)]
+
+
+def match_part_of_speech(*parts: PartOfSpeech) -> Policy:
+    def policy(options: List[HebrewWord]) -> List[HebrewWord]:
+        return [option for option in options if option.part_of_speech in parts]
+
+    return policy
+
+
+DEFAULT_POLICIES = (non_construct,)
+
+
+def select(
+    options: List[HebrewWord], policies: Sequence[Policy] = DEFAULT_POLICIES
+) -> Tuple[Optional[HebrewWord], List[HebrewWord]]:
+    """
+    Returns (choice, remaining options). A policy that would rule out every
+    option is ignored; choice is None unless exactly one option is left.
+
+    """
+    remaining = list(options)
+    for policy in policies:
+        if narrowed := policy(remaining):
+            remaining = narrowed
+    return (remaining[0] if len(remaining) == 1 else None), remaining
+
+
+class ReviewQueue:
+    """
+    Words a headless run couldn't decide on, one JSON object per line with the
+    options still in contention, so they can be resolved later in one sitting.
+    Lines are appended as they come, so an interrupted run loses nothing.
+
+    """
+
+    def __init__(self, path: str = REVIEW_QUEUE):
+        self.path = path
+
+    def add(self, word: str, options: List[HebrewWord], reason: str) -> None:
+        entry = {
+            "word": word,
+            "reason": reason,
+            "options": [asdict(option) for option in options],
+        }
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+    def entries(self) -> List[dict]:
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def replace_entries(self, entries: List[dict]) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+
+
+def entry_options(entry: dict) -> List[HebrewWord]:
+    # Enums were written as "PartOfSpeech.NOUN", which from_dataframe reads back
+    return from_dataframe(pd.DataFrame(entry["options"]))
+
+
+class BatchChooser:
+    """
+    Stands in for the interactive prompt in iter_translations: picks with the
+    policies, and queues the word for review when they leave no single option.
+
+    """
+
+    def __init__(
+        self,
+        policies: Sequence[Policy] = DEFAULT_POLICIES,
+        review_queue: Optional[ReviewQueue] = None,
+    ):
+        self.policies = policies
+        self.review_queue = review_queue if review_queue is not None else ReviewQueue()
+        self.queued: List[str] = []
+
+    def __call__(self, word: str, options: List[HebrewWord]) -> Optional[HebrewWord]:
+        choice, remaining = select(options, self.policies)
+        if choice is None:
+            self.review_queue.add(
+                word, remaining, "ambiguous" if remaining else "not found"
+            )
+            self.queued.append(word)
+        return choice
+
+
+def translate_batch(
+    words: Iterable[str],
+    driver,
+    policies: Sequence[Policy] = DEFAULT_POLICIES,
+    review_queue: Optional[ReviewQueue] = None,
+    lookup_audio: bool = True,
+    engine: str = "selenium",
+    pool: Optional[ScraperPool] = None,
+    reselect: bool = False,
+) -> Tuple[List[HebrewWord], List[str], List[str]]:
+    """
+    translate_text without an operator: audio is always kept and undecided
+    words go to the review queue. words can be get_list_of_words(text) or
+    iter_tokens(path). Returns (selected, queued words, failed words).
+    Earlier manual choices are reused; policy picks are not remembered.
+
+    """
+    chooser = BatchChooser(policies, review_queue)
+    selected = []
+    failed_words = []
+    for word, choice, ok in iter_translations(
+        words,
+        driver,
+        lookup_audio=lookup_audio,
+        engine=engine,
+        pool=pool,
+        choose=chooser,
+        check_audio=False,
+        recall=not reselect,
+        remember=False,
+    ):
+        if not ok:
+            failed_words.append(word)
+        elif choice is not None:
+            selected.append(choice)
+
+    return selected, chooser.queued, failed_words
+
+
+def resolve_review_queue(
+    review_queue: Optional[ReviewQueue] = None, lookup_audio: bool = True
+) -> List[HebrewWord]:
+    """
+    Prompts for every queued word in one pass. Words skipped again stay
+    queued; everything chosen is removed from the file and returned.
+
+    """
+    review_queue = review_queue if review_queue is not None else ReviewQueue()
+    selected = []
+    unresolved = []
+    for entry in review_queue.entries():
+        print(f"\nReviewing: {entry['word']} ({entry['reason']})")
+        choice = choose_option(
+            entry["word"], entry_options(entry), lookup_audio=lookup_audio
+        )
+        if choice is None:
+            unresolved.append(entry)
+        else:
+            record_selection(entry["word"], choice)
+            selected.append(choice)
+
+    review_queue.replace_entries(unresolved)
+    return selected
@@ -1,18 +1,78 @@
+from __future__ import annotations
+
 from words import HebrewWord, PartOfSpeech, Binyaan, HEBREW_CLASS_MAP, get_word_attrs
+import atexit
 import os
-from typing import List
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
 import hashlib
-import pandas as pd
-from dataclasses import asdict
+from util import lazy_import
+from dataclasses import asdict, fields
+import metrics
+import profiling
+
+pd = lazy_import("pandas")
 
 CACHE_DIRECTORY = "resources/cache/cache.csv"
 COLS = get_word_attrs()
 
-def get_note_id_from_word(word: HebrewWord) -> int:
+LRU_SIZE = 4096
+NEGATIVE_CACHE_TTL = 30 * 24 * 60 * 60  # seconds a "not found" is trusted for
+WRITE_BATCH_SIZE = 64
+
+_connections: dict[str, sqlite3.Connection] = {}
+_lock = threading.RLock()
+_pending: dict[str, List[HebrewWord]] = {}
+_batch_depth: dict[str, int] = {}
+_unexported: set[str] = set()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = LRU_SIZE):
+        self.maxsize = maxsize
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Tuple[HebrewWord, ...]]:
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value: Tuple[HebrewWord, ...]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+memory_cache = LRUCache()
+
+
+def note_id_from_values(word, transliteration, meaning) -> int:
     # Hash full identifying attributes
-    unique_str = f"{word.word}|{word.transliteration}|{word.meaning}"
+    unique_str = f"{word}|{transliteration}|{meaning}"
     return int(hashlib.sha256(unique_str.encode()).hexdigest(), 16) % (10**10)
 
+
+def get_note_id_from_word(word: HebrewWord) -> int:
+    return note_id_from_values(word.word, word.transliteration, word.meaning)
+
+
 def parse_enum(enum_str: str):
     module = globals()  # or use a more secure/custom module dict if needed
     enum_class_name, member_name = enum_str.split(".")
@@ -27,11 +87,13 @@ def parse_enum(enum_str: str):
         raise ValueError(f"Member '{member_name}' not found in '{enum_class_name}'")
 
 
+@profiling.tracked
 def to_dataframe(words: List[HebrewWord]) -> pd.DataFrame:
     return pd.DataFrame([asdict(word) for word in words])
 
 
-def from_dataframe(df: pd.DataFrame) -> List[HebrewWord]:
+def from_dataframe_rowwise(df: pd.DataFrame) -> List[HebrewWord]:
+    """Row-at-a-time decoder, kept as the reference for from_dataframe."""
     result = []
     for _, row in df.iterrows():
         kwargs = row.dropna().to_dict()
@@ -62,19 +124,314 @@ def from_dataframe(df: pd.DataFrame) -> List[HebrewWord]:
     return result
 
 
-def check_cache(query: str) -> List[HebrewWord]:
-    df = pd.read_csv(CACHE_DIRECTORY)
+# "PartOfSpeech.NOUN" -> PartOfSpeech.NOUN, built once instead of parse_enum per row
+POS_LOOKUP = {str(pos): pos for pos in PartOfSpeech} | {
+    pos: pos for pos in PartOfSpeech
+}
+BINYAAN_LOOKUP = {str(b): b for b in Binyaan} | {b: b for b in Binyaan}
+CLASS_FIELDS = {
+    pos: [field.name for field in fields(cls)] for pos, cls in HEBREW_CLASS_MAP.items()
+}
+
+
+@profiling.tracked
+def from_dataframe(df: pd.DataFrame) -> List[HebrewWord]:
+    if df.empty:
+        return []
+
+    df = df.reset_index(drop=True).astype(object)
+    df = df.where(df.notna(), None)
+
+    pos = (
+        df["part_of_speech"].map(POS_LOOKUP)
+        if "part_of_speech" in df
+        else pd.Series(None, index=df.index, dtype=object)
+    )
+    pos = pos.where(pos.notna(), PartOfSpeech.WORD)
+    df["part_of_speech"] = pos
+    if "binyan" in df:
+        df["binyan"] = df["binyan"].map(BINYAAN_LOOKUP).astype(object)
+        df["binyan"] = df["binyan"].where(df["binyan"].notna(), None)
+
+    result: List[HebrewWord] = [None] * len(df)
+    for pos_enum, group in df.groupby(pos.map(lambda p: p.name), sort=False):
+        pos_enum = PartOfSpeech[pos_enum]
+        cls = HEBREW_CLASS_MAP[pos_enum]
+        names = [name for name in CLASS_FIELDS[pos_enum] if name in group]
+        values = group[names].itertuples(index=False, name=None)
+        for i, row in zip(group.index, values):
+            result[i] = cls(**dict(zip(names, row)))
+    return result
+
+
+def get_cache_db_path(file: str = CACHE_DIRECTORY) -> str:
+    """The indexed store lives next to the legacy CSV: cache.csv -> cache.sqlite"""
+    return os.path.splitext(file)[0] + ".sqlite"
 
-    lookup = df.loc[df["word"] == query]
-    return from_dataframe(lookup)
 
+def _encode(value):
+    # Enums are stored the same way pandas writes them to CSV ("PartOfSpeech.NOUN")
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    return str(value)
 
-def write_cache(words: List[HebrewWord], file: str = CACHE_DIRECTORY) -> None:
-    df = to_dataframe(words)
 
-    # Reorder columns to match COLS, inserting NaNs where necessary
+def _insert_rows(conn: sqlite3.Connection, df: pd.DataFrame) -> None:
     df = df.reindex(columns=COLS)
+    rows = []
+    for row in df.itertuples(index=False):
+        values = tuple(_encode(v) for v in row)
+        record = dict(zip(COLS, values))
+        note_id = note_id_from_values(
+            record["word"], record["transliteration"], record["meaning"]
+        )
+        rows.append(values + (str(note_id),))
+
+    columns = ", ".join(f'"{col}"' for col in COLS + ["note_id"])
+    placeholders = ", ".join("?" for _ in range(len(COLS) + 1))
+    # A note already stored takes the new values field by field, but a blank
+    # never overwrites a value; the row keeps its place
+    updates = ", ".join(
+        f'"{col}" = COALESCE(excluded."{col}", "{col}")' for col in COLS
+    )
+    conn.executemany(
+        f"INSERT INTO words ({columns}) VALUES ({placeholders}) "
+        f"ON CONFLICT(note_id) DO UPDATE SET {updates}",
+        rows,
+    )
+
+
+def _csv_signature(file: str) -> Optional[str]:
+    if not os.path.exists(file):
+        return None
+    stat = os.stat(file)
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _set_csv_signature(conn: sqlite3.Connection, file: str) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_signature', ?)",
+        (_csv_signature(file),),
+    )
+
+
+def _import_csv(conn: sqlite3.Connection, file: str) -> None:
+    """
+    Imports the CSV whenever it changed since the store last read or wrote it:
+    on first use, after a git pull or a hand edit. The CSV is authoritative
+    then: the words table is replaced with its rows in one transaction, so a
+    row deleted by hand stays deleted.
+
+    """
+    signature = _csv_signature(file)
+    if signature is None:
+        return
+    row = conn.execute("SELECT value FROM meta WHERE key = 'csv_signature'").fetchone()
+    if row is not None and row[0] == signature:
+        return
+    df = pd.read_csv(file, dtype=str)
+    with conn:
+        conn.execute("DELETE FROM words")
+        _insert_rows(conn, df)
+        _set_csv_signature(conn, file)
+    print(f"Imported {len(df)} cached words from {file}")
+
+
+def get_cache_connection(file: str = CACHE_DIRECTORY) -> sqlite3.Connection:
+    db_path = get_cache_db_path(file)
+    with _lock:
+        conn = _connections.get(db_path)
+        if conn is not None:
+            return conn
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, check_same_thread=False)
+        columns = ", ".join(f'"{col}" TEXT' for col in COLS + ["note_id"])
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS words ({columns})")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS misses (word TEXT PRIMARY KEY, checked_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS selections "
+                "(token TEXT PRIMARY KEY, note_id TEXT, chosen_at REAL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+            )
+            conn.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_words_note_id ON words (note_id)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_words_word ON words (word)")
+        _import_csv(conn, file)
+
+        _connections[db_path] = conn
+        return conn
+
+
+def _fetch_rows(conn: sqlite3.Connection, where: str = "", params=()) -> List[tuple]:
+    columns = ", ".join(f'"{col}"' for col in COLS + ["note_id"])
+    with _lock:
+        return conn.execute(
+            f"SELECT {columns} FROM words {where} ORDER BY rowid", params
+        ).fetchall()
+
+
+def _select_rows(conn: sqlite3.Connection, where: str = "", params=()) -> pd.DataFrame:
+    return pd.DataFrame(_fetch_rows(conn, where, params), columns=COLS + ["note_id"])
+
+
+def _decode_row(row: tuple) -> HebrewWord:
+    # from_dataframe for a single stored row, without building a frame
+    record = dict(zip(COLS, row))
+    pos = POS_LOOKUP.get(record["part_of_speech"], PartOfSpeech.WORD)
+    record["part_of_speech"] = pos
+    if record.get("binyan") is not None:
+        record["binyan"] = BINYAAN_LOOKUP.get(record["binyan"])
+    return HEBREW_CLASS_MAP[pos](**{name: record[name] for name in CLASS_FIELDS[pos]})
+
+
+def check_cache(query: str, file: str = CACHE_DIRECTORY) -> List[HebrewWord]:
+    db_path = get_cache_db_path(file)
+    key = (db_path, query)
+    cached = memory_cache.get(key)
+    if cached is not None:
+        metrics.inc("cache_lookups_total", layer="memory", result="hit")
+        return list(cached)
+
+    conn = get_cache_connection(file)
+    rows = _fetch_rows(conn, "WHERE word = ?", (query,))
+    lookup = [_decode_row(row) for row in rows]
+
+    # Words still waiting in an open batch count as cached
+    with _lock:
+        seen = {row[-1] for row in rows}
+        for word in _pending.get(db_path, []):
+            if word.word == query and str(get_note_id_from_word(word)) not in seen:
+                lookup.append(word)
+                seen.add(str(get_note_id_from_word(word)))
+        if not _pending.get(db_path):
+            memory_cache.put(key, tuple(lookup))
+    metrics.inc(
+        "cache_lookups_total", layer="store", result="hit" if lookup else "miss"
+    )
+    return lookup
+
+
+def _flush(file: str) -> None:
+    db_path = get_cache_db_path(file)
+    with _lock:
+        words = _pending.pop(db_path, [])
+        if not words:
+            return
+
+        conn = get_cache_connection(file)
+        written = {word.word for word in words}
+        # One transaction per batch: either every row lands or none does
+        with conn:
+            _insert_rows(conn, to_dataframe(words))
+            conn.executemany(
+                "DELETE FROM misses WHERE word = ?", [(w,) for w in written]
+            )
+        for word in written:
+            memory_cache.invalidate((db_path, word))
+        _unexported.add(file)
+
+
+def write_cache(words: List[HebrewWord], file: str = CACHE_DIRECTORY) -> None:
+    if not words:
+        return
+
+    db_path = get_cache_db_path(file)
+    with _lock:
+        _pending.setdefault(db_path, []).extend(words)
+        for word in words:
+            memory_cache.invalidate((db_path, word.word))
+        if (
+            _batch_depth.get(db_path, 0) == 0
+            or len(_pending[db_path]) >= WRITE_BATCH_SIZE
+        ):
+            _flush(file)
+
+
+@contextmanager
+def batched_writes(file: str = CACHE_DIRECTORY):
+    """Holds write_cache calls in memory and writes them in one transaction per batch."""
+    db_path = get_cache_db_path(file)
+    with _lock:
+        _batch_depth[db_path] = _batch_depth.get(db_path, 0) + 1
+    try:
+        yield
+    finally:
+        with _lock:
+            _batch_depth[db_path] -= 1
+            if _batch_depth[db_path] == 0:
+                _flush(file)
+
+
+def is_known_miss(
+    query: str, ttl: float = NEGATIVE_CACHE_TTL, file: str = CACHE_DIRECTORY
+) -> bool:
+    """True if a lookup for query found nothing less than ttl seconds ago."""
+    conn = get_cache_connection(file)
+    with _lock:
+        row = conn.execute(
+            "SELECT checked_at FROM misses WHERE word = ?", (query,)
+        ).fetchone()
+    return row is not None and time.time() - row[0] < ttl
+
+
+def record_miss(query: str, file: str = CACHE_DIRECTORY) -> None:
+    conn = get_cache_connection(file)
+    with _lock, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO misses (word, checked_at) VALUES (?, ?)",
+            (query, time.time()),
+        )
+
+
+def recall_selection(
+    token: str, options: List[HebrewWord], file: str = CACHE_DIRECTORY
+) -> Optional[HebrewWord]:
+    """The option chosen for token on an earlier run, if it is still offered."""
+    conn = get_cache_connection(file)
+    with _lock:
+        row = conn.execute(
+            "SELECT note_id FROM selections WHERE token = ?", (token,)
+        ).fetchone()
+    if row is None:
+        return None
+    return next(
+        (option for option in options if str(get_note_id_from_word(option)) == row[0]),
+        None,
+    )
+
+
+def record_selection(token: str, word: HebrewWord, file: str = CACHE_DIRECTORY) -> None:
+    conn = get_cache_connection(file)
+    with _lock, conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO selections (token, note_id, chosen_at) VALUES (?, ?, ?)",
+            (token, str(get_note_id_from_word(word)), time.time()),
+        )
+
+
+def export_cache_csv(file: str = CACHE_DIRECTORY) -> None:
+    """Writes the indexed store back out as the human-readable CSV."""
+    with _lock:
+        _flush(file)
+        conn = get_cache_connection(file)
+        tmp_path = f"{file}.tmp"
+        _select_rows(conn)[COLS].to_csv(tmp_path, index=False)
+        os.replace(tmp_path, file)
+        with conn:
+            _set_csv_signature(conn, file)
+        _unexported.discard(file)
 
-    write_header = not os.path.exists(file)
 
-    df.to_csv(CACHE_DIRECTORY, mode="a", index=False, header=write_header)
+@atexit.register
+def _export_written() -> None:
+    # Keeps the committed CSV in step with what this process added to the store
+    for file in list(_unexported):
+        if os.path.isdir(os.path.dirname(file) or "."):
+            export_cache_csv(file)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from typing import Dict, Iterable, Optional
+
+SNAPSHOT_DIRECTORY = "resources/anki"
+
+
+def short_hash(value) -> str:
+    text = unicodedata.normalize("NFC", str(value))
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def hash_fields(fields: Dict[str, str]) -> Dict[str, str]:
+    return {name: short_hash(value) for name, value in fields.items()}
+
+
+def hash_tags(tags: Iterable[str]) -> str:
+    return short_hash(" ".join(sorted(set(tags))))
+
+
+def note_state(
+    note_id: int, model: str, fields: Dict[str, str], tags: Iterable[str]
+) -> dict:
+    """
+    What a sync needs to know about a note without asking Anki: its id and
+    model, a hash per field, a hash of its tags, and the raw Audio field (kept
+    as-is when a word no longer has audio).
+
+    """
+    return {
+        "note_id": note_id,
+        "model": model,
+        "fields": hash_fields(fields),
+        "audio": fields.get("Audio", ""),
+        "tags": hash_tags(tags),
+    }
+
+
+def note_state_from_info(note: dict) -> dict:
+    """note_state for a notesInfo entry."""
+    return note_state(
+        note["noteId"],
+        note.get("modelName", ""),
+        {name: field["value"] for name, field in note.get("fields", {}).items()},
+        note.get("tags", []),
+    )
+
+
+def fields_changed(state: dict, new_fields: Dict[str, str]) -> bool:
+    """Hash-based fields_differ: blank new values never count as a change."""
+    return any(
+        short_hash(value) != state["fields"].get(name)
+        for name, value in new_fields.items()
+        if (value is not None) and (value != "")
+    )
+
+
+class DeckSnapshot:
+    """
+    Last known state of every note in a deck, keyed by InternalGUID and kept
+    on disk, so a sync can work out what changed without querying Anki.
+
+    """
+
+    def __init__(
+        self,
+        deck_name: str,
+        notes: Optional[Dict[str, dict]] = None,
+        directory: str = SNAPSHOT_DIRECTORY,
+    ):
+        self.deck_name = deck_name
+        self.notes: Dict[str, dict] = notes or {}
+        self.directory = directory
+
+    @property
+    def path(self) -> str:
+        safe_name = re.sub(r"[^\w\-א-ת]", "_", self.deck_name)
+        return os.path.join(self.directory, f"{safe_name}.json")
+
+    @classmethod
+    def load(
+        cls, deck_name: str, directory: str = SNAPSHOT_DIRECTORY
+    ) -> Optional["DeckSnapshot"]:
+        snapshot = cls(deck_name, directory=directory)
+        if not os.path.exists(snapshot.path):
+            return None
+        with open(snapshot.path, encoding="utf-8") as f:
+            snapshot.notes = json.load(f)
+        return snapshot
+
+    def save(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.notes, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,91 @@
+import pytest
+
+from anki import (
+    MODEL_AUDIO,
+    MODEL_NO_AUDIO,
+    apply_plan,
+    build_note,
+    ensure_deck_exists,
+    ensure_models_exist,
+)
+from fake_anki import FakeAnki, FakeAnkiClient
+from media import MediaManifest
+from serial import get_note_id_from_word
+from words import HebrewNoun
+
+DECK = "Test"
+
+
+@pytest.fixture
+def anki():
+    client = FakeAnkiClient(FakeAnki())
+    ensure_models_exist(client=client)
+    ensure_deck_exists(DECK, client=client)
+    return client
+
+
+def switch_to_audio(client, words):
+    """Notes added without audio, and the plan that moves them to the audio model."""
+    plan = {"media": {}, "deletions": [], "adds": [], "updates": []}
+    planned, note_ids = {}, []
+    for word in words:
+        guid = str(get_note_id_from_word(word))
+        note_id = client.invoke(
+            "addNote", note=build_note(word, DECK, guid, MODEL_NO_AUDIO)
+        )
+        tag = f"[sound:{word.word}.mp3]"
+        plan["media"][word.path_to_audio] = [guid]
+        plan["deletions"].append((guid, note_id))
+        plan["adds"].append((guid, build_note(word, DECK, guid, MODEL_AUDIO, tag)))
+        planned[guid] = (word, (word.path_to_audio, tag))
+        note_ids.append(note_id)
+    return plan, planned, note_ids
+
+
+def audio_word(tmp_path, text):
+    audio = tmp_path / f"{text}.mp3"
+    audio.write_bytes(text.encode())
+    return HebrewNoun(word=text, meaning=text, path_to_audio=str(audio))
+
+
+def test_failed_media_upload_keeps_the_old_note(anki, tmp_path, monkeypatch):
+    word = audio_word(tmp_path, "חתול")
+    plan, planned, [note_id] = switch_to_audio(anki, [word])
+
+    def store_media_file(**_):
+        raise Exception("disk full")
+
+    monkeypatch.setattr(anki.backend, "_storeMediaFile", store_media_file)
+    failed = {}
+    manifest = MediaManifest(str(tmp_path / "manifest.json"))
+    changed = apply_plan(plan, planned, failed, manifest, anki)
+
+    assert list(failed.values()) == [word]
+    assert changed == {}
+    assert list(anki.backend.notes) == [note_id]
+    assert anki.backend.notes[note_id]["modelName"] == MODEL_NO_AUDIO
+
+
+def test_failed_deletion_is_reported_per_note(anki, tmp_path, monkeypatch):
+    cat, dog = audio_word(tmp_path, "חתול"), audio_word(tmp_path, "כלב")
+    plan, planned, [cat_id, dog_id] = switch_to_audio(anki, [cat, dog])
+    delete_notes = anki.backend._deleteNotes
+
+    def fail_on_cat(notes):
+        if cat_id in notes:
+            raise Exception("note is locked")
+        delete_notes(notes)
+
+    monkeypatch.setattr(anki.backend, "_deleteNotes", fail_on_cat)
+    failed = {}
+    manifest = MediaManifest(str(tmp_path / "manifest.json"))
+    changed = apply_plan(plan, planned, failed, manifest, anki)
+
+    assert list(failed.values()) == [cat]
+    assert anki.backend.notes[cat_id]["modelName"] == MODEL_NO_AUDIO
+    assert dog_id not in anki.backend.notes
+    assert [note["modelName"] for note in anki.backend.notes.values()] == [
+        MODEL_NO_AUDIO,
+        MODEL_AUDIO,
+    ]
+    assert [state["model"] for state in changed.values()] == [MODEL_AUDIO]
@@ -0,0 +1,29 @@
+import os
+
+import audio
+from audio import download_audio, get_audio_path, get_legacy_audio_path
+from words import HebrewNoun
+
+URL = "https://translate.google.com/translate_tts?ie=UTF-8&tl=iw&client=tw-ob&q=חתול"
+
+
+def test_legacy_file_is_reused_in_place(tmp_path, monkeypatch):
+    def fetch_to_file(*args):
+        raise AssertionError("downloaded a file that was already on disk")
+
+    monkeypatch.setattr(audio, "fetch_to_file", fetch_to_file)
+    cat = HebrewNoun(word="חתול", meaning="cat", path_to_audio=URL)
+    kitten = HebrewNoun(word="חתול", meaning="kitten", path_to_audio=URL)
+    legacy_path = get_legacy_audio_path(cat, str(tmp_path))
+    with open(legacy_path, "wb") as f:
+        f.write(b"mp3")
+
+    path = download_audio(cat, str(tmp_path))
+
+    assert path == get_audio_path(cat, str(tmp_path))
+    assert download_audio(kitten, str(tmp_path)) == path
+    with open(legacy_path, "rb") as legacy, open(path, "rb") as shared:
+        assert legacy.read() == shared.read() == b"mp3"
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(p) for p in [legacy_path, path]
+    )
@@ -0,0 +1,27 @@
+import pytest
+
+from hebrew_processing import find_variations
+
+
+@pytest.mark.parametrize(
+    "word, expected",
+    [
+        ("ומלך", ["ומלך", "מלך", "לך"]),
+        ("וכלב", ["וכלב", "כלב", "לב"]),
+        ("וכרם", ["וכרם", "כרם", "רם"]),
+        ("ומברשת", ["ומברשת", "מברשת", "ברשת"]),
+    ],
+)
+def test_fewer_prefixes_removed_comes_first(word, expected):
+    assert find_variations(word) == expected
+
+
+def test_frequency_orders_forms_that_lost_the_same_prefixes():
+    # עליה is more frequent than עלייה; both lost only the ו
+    assert find_variations("ועלייה") == ["ועלייה", "ועליה", "עליה", "עלייה"]
+    assert find_variations("ועלייה", rank=False) == [
+        "ועלייה",
+        "ועליה",
+        "עלייה",
+        "עליה",
+    ]
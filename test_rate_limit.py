@@ -0,0 +1,66 @@
+import pytest
+
+import rate_limit
+from rate_limit import TokenBucket
+
+
+class FrozenClock:
+    """Stands in for time in rate_limit: the clock only moves when a test moves it."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FrozenClock()
+    monkeypatch.setattr(rate_limit, "time", clock)
+    return clock
+
+
+def test_waiters_queue_behind_a_pause(clock):
+    bucket = TokenBucket(rate=10.0, capacity=1, initial_backoff=5.0)
+    assert bucket.acquire() == 0.0
+
+    bucket.report(429)
+    waits = [bucket.acquire() for _ in range(3)]
+
+    assert waits == pytest.approx([5.1, 5.2, 5.3])
+
+
+def test_tokens_do_not_accrue_during_a_pause(clock):
+    bucket = TokenBucket(rate=10.0, capacity=3, initial_backoff=5.0)
+    bucket.report(503)
+
+    clock.now += 2.0
+    assert bucket.acquire() == pytest.approx(3.1)
+    clock.now += 3.1
+    assert bucket.acquire() == pytest.approx(0.1)
+
+
+def test_empty_streak_pauses_without_backing_off(clock):
+    bucket = TokenBucket(rate=10.0, capacity=1, initial_backoff=5.0, empty_streak=3)
+    for _ in range(3):
+        bucket.report(200, empty=True)
+
+    assert not bucket.backing_off
+    assert bucket.acquire() == pytest.approx(5.1)
+
+
+def test_backing_off_ends_when_the_server_answers(clock):
+    bucket = TokenBucket()
+    bucket.report(429)
+    assert bucket.backing_off
+
+    # Selenium can't see status codes, so its empty pages prove nothing
+    bucket.report(None, empty=True)
+    assert bucket.backing_off
+
+    bucket.report(200, empty=True)
+    assert not bucket.backing_off
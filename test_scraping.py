@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+import translator
+from fake_pealim import PealimFixtureServer
+from rate_limit import TokenBucket
+from words import Binyaan, HebrewNoun, HebrewVerb
+
+FIXTURES = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "resources", "fixtures", "pealim"
+)
+
+
+@pytest.fixture
+def scrape(monkeypatch):
+    """scrape_hebrew_word_http against the saved pages, served on localhost."""
+    monkeypatch.setattr(
+        translator,
+        "PEALIM_RATE_LIMITER",
+        TokenBucket(rate=1e9, capacity=10**9, empty_streak=10**9),
+    )
+    with PealimFixtureServer(directory=FIXTURES) as server:
+        session = translator.get_http_session(pool_size=1)
+        yield lambda query: translator.scrape_hebrew_word_http(
+            query,
+            session,
+            lookup_audio=False,
+            base_url=server.search_url,
+            check_audio=False,
+        )
+        session.close()
+
+
+def test_noun_results(scrape):
+    words = scrape("חתול")
+
+    assert all(type(word) is HebrewNoun for word in words)
+    assert [word.meaning for word in words] == [
+        "🐈 cat",
+        "cat of ...",
+        "diaper, nappy",
+        "diaper of ...",
+    ]
+    assert [word.transliteration for word in words] == [
+        "chatul",
+        "chatul-",
+        "chitul",
+        "chitul-",
+    ]
+    assert [word.root for word in words] == [None, None, "ח - ת - ל", "ח - ת - ל"]
+    assert {(w.word, w.gender, w.number, w.definite) for w in words} == {
+        ("חתול", "masculine", "singular", "False")
+    }
+    assert all(word.path_to_audio is None for word in words)
+
+
+def test_verb_and_noun_results(scrape):
+    words = scrape("כתב")
+
+    assert [(type(word), word.transliteration) for word in words] == [
+        (HebrewVerb, "katav"),
+        (HebrewVerb, "ktov!"),
+        (HebrewNoun, "katav"),
+        (HebrewNoun, "katav-"),
+        (HebrewNoun, "ktav"),
+        (HebrewNoun, "ktav-"),
+        (HebrewVerb, "katev!"),
+        (HebrewVerb, "kitev"),
+        (HebrewVerb, "kutav"),
+    ]
+    assert {word.root for word in words} == {"כ - ת - ב"}
+    verbs = [word for word in words if type(word) is HebrewVerb]
+    assert [(v.binyan, v.tense, v.person) for v in verbs] == [
+        (Binyaan.PAAL, "past", "3rd person"),
+        (Binyaan.PAAL, None, "2nd person"),
+        (Binyaan.PIEL, None, "2nd person"),
+        (Binyaan.PIEL, "past", "3rd person"),
+        (Binyaan.PIEL, "past", "3rd person"),
+    ]
+    assert words[0].meaning == "he / it wrote"
+    assert words[4].meaning == "writing, script"
+
+
+def test_no_results(scrape):
+    assert scrape("אבגד") == []
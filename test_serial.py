@@ -0,0 +1,69 @@
+import pytest
+
+import serial
+from serial import check_cache, export_cache_csv, write_cache
+from words import Binyaan, HebrewNoun, HebrewVerb, PartOfSpeech
+
+CAT = HebrewNoun(
+    word="חתול",
+    meaning="cat",
+    transliteration="chatul",
+    menukad="חָתוּל",
+    part_of_speech=PartOfSpeech.NOUN,
+    gender="masculine",
+    number="singular",
+    definite="False",
+)
+WROTE = HebrewVerb(
+    word="כתב",
+    meaning="he / it wrote",
+    transliteration="katav",
+    part_of_speech=PartOfSpeech.VERB,
+    root="כ - ת - ב",
+    binyan=Binyaan.PAAL,
+    tense="past",
+    person="3rd person",
+)
+
+
+def reopen():
+    """What the next run sees: no open store, nothing in memory."""
+    for conn in serial._connections.values():
+        conn.close()
+    serial._connections.clear()
+    serial.memory_cache.clear()
+
+
+@pytest.fixture
+def cache_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(serial, "_connections", {})
+    monkeypatch.setattr(serial, "_unexported", set())
+    serial.memory_cache.clear()
+    yield str(tmp_path / "cache.csv")
+    reopen()
+
+
+def test_round_trip(cache_file):
+    write_cache([CAT, WROTE], cache_file)
+    export_cache_csv(cache_file)
+    reopen()
+
+    assert check_cache("חתול", cache_file) == [CAT]
+    assert check_cache("כתב", cache_file) == [WROTE]
+
+
+def test_row_deleted_from_the_csv_stays_deleted(cache_file):
+    write_cache([CAT, WROTE], cache_file)
+    export_cache_csv(cache_file)
+    reopen()
+
+    with open(cache_file, encoding="utf-8") as f:
+        lines = f.readlines()
+    with open(cache_file, "w", encoding="utf-8") as f:
+        f.writelines(line for line in lines if not line.startswith("כתב,"))
+
+    assert check_cache("כתב", cache_file) == []
+    export_cache_csv(cache_file)
+    with open(cache_file, encoding="utf-8") as f:
+        assert "כתב," not in f.read()
+    assert check_cache("חתול", cache_file) == [CAT]
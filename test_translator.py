@@ -0,0 +1,85 @@
+import csv
+import os
+
+import pytest
+
+import lexicon
+import serial
+import translator
+from words import HebrewNoun, PartOfSpeech
+
+LEXICON_ROWS = [
+    # Like resources/frequency_list.csv: a meaning, no part of speech
+    {
+        "frequency_rank": "0",
+        "word": "מלך",
+        "meaning": "king",
+        "transliteration": "melekh",
+    },
+    {
+        "frequency_rank": "1",
+        "word": "חתול",
+        "meaning": "cat",
+        "transliteration": "chatul",
+        "part_of_speech": "NOUN",
+    },
+]
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """A lexicon and an empty cache under tmp_path, and a scraper that records its queries."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("resources/cache")
+    with open(lexicon.FREQUENCY_LIST, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, ["frequency_rank", *lexicon.LEXICON_COLS])
+        writer.writeheader()
+        writer.writerows(LEXICON_ROWS)
+    monkeypatch.setattr(lexicon, "_connections", {})
+    monkeypatch.setattr(serial, "_connections", {})
+    monkeypatch.setattr(serial, "_unexported", set())
+    serial.memory_cache.clear()
+
+    scraped = []
+
+    def scraper(query, driver, lookup_audio, check_audio):
+        scraped.append(query)
+        return [HebrewNoun(word=query, meaning="scraped", transliteration="x")]
+
+    monkeypatch.setitem(translator.SCRAPERS, "fake", scraper)
+    yield lambda query: translator.lookup_hebrew_word(
+        query, None, lookup_audio=False, engine="fake", check_audio=False
+    ), scraped
+    serial.memory_cache.clear()
+
+
+def test_lexicon_entry_with_part_of_speech_skips_pealim(pipeline):
+    lookup, scraped = pipeline
+
+    words = lookup("חתול")
+
+    assert [(type(w), w.meaning) for w in words] == [(HebrewNoun, "cat")]
+    assert scraped == []
+    assert serial.check_cache("חתול") == []
+
+
+def test_bare_lexicon_entry_does_not_shadow_pealim(pipeline):
+    lookup, scraped = pipeline
+
+    words = lookup("מלך")
+
+    assert scraped == ["מלך"]
+    assert [w.meaning for w in words] == ["scraped"]
+    assert [w.meaning for w in serial.check_cache("מלך")] == ["scraped"]
+
+
+def test_bare_lexicon_entry_is_the_fallback(pipeline, monkeypatch):
+    lookup, scraped = pipeline
+    monkeypatch.setitem(translator.SCRAPERS, "fake", lambda *args, **kwargs: [])
+
+    words = lookup("מלך")
+
+    assert [(w.part_of_speech, w.meaning) for w in words] == [
+        (PartOfSpeech.WORD, "king")
+    ]
+    assert serial.check_cache("מלך") == []
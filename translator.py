@@ -1,17 +1,48 @@
-import time
+from __future__ import annotations
+
 import re
 import string
-from dataclasses import fields
-from util import yes_or_no_input
+from dataclasses import fields, replace
+from functools import partial
+from util import lazy_import, yes_or_no_input
 from hebrew_processing import find_variations
-import random
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException
-from serial import write_cache, check_cache
+import queue
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from serial import (
+    batched_writes,
+    write_cache,
+    check_cache,
+    is_known_miss,
+    record_miss,
+    recall_selection,
+    record_selection,
+    NEGATIVE_CACHE_TTL,
+)
 from words import HebrewWord, PartOfSpeech, BINYAAN_MAP, HEBREW_CLASS_MAP, POS_MAP
-from typing import List, Optional
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 from audio import get_audio
+from lexicon import lookup_lexicon
+from rate_limit import TokenBucket
+import metrics
+import profiling
+import time
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+# Loaded on first use; Selenium is imported inside scrape_hebrew_word
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
 
 
 def detect_unique_word(s: str, looking_for: list[str]) -> Optional[str]:
@@ -19,16 +50,195 @@ def detect_unique_word(s: str, looking_for: list[str]) -> Optional[str]:
     return found[0] if len(found) == 1 else None
 
 
+PEALIM_SEARCH_URL = "https://www.pealim.com/search/"
+HTTP_TIMEOUT = 15  # seconds
+HTTP_HEADERS = {"User-Agent": "Mozilla/5.0 (hebrew-flashcards)"}
+HTTP_RETRIES = 3
+
+# Shared by every engine and pool worker; replace it to change the pace
+PEALIM_RATE_LIMITER = TokenBucket(rate=1.0, capacity=3)
+
+
 # TODO: only nouns and verbs are handled right now
-def scrape_hebrew_word(
-    query: str, driver: webdriver, lookup_audio: bool = True
+def words_from_container(
+    query: str,
+    root: Optional[str],
+    word_data: str,
+    forms: List[dict],
 ) -> List[HebrewWord]:
-    url = f"https://www.pealim.com/search/?q={query}"
-    driver.get(url)
-    time.sleep(random.uniform(1, 2))
+    """
+    Builds words from one search result, whichever engine extracted it.
+    word_data is the lowercased "Part of speech" line, each form a dict with
+    menukad, transliteration, meaning and notes (lowercased, or None).
+    Audio is left out; see with_audio.
 
+    """
     scraped = []
+    for form in forms:
+        kwargs = {
+            "word": query,
+            "root": root,
+            "part_of_speech": PartOfSpeech.WORD,
+        }
+
+        kwargs["menukad"] = form["menukad"]
+        transliteration = form["transliteration"]
+        kwargs["transliteration"] = transliteration
+        meaning = form["meaning"]
+        kwargs["meaning"] = meaning
+
+        notes = form["notes"]
+
+        if "noun" in word_data.split():
+            kwargs["part_of_speech"] = PartOfSpeech.NOUN
+            kwargs["gender"] = detect_unique_word(
+                word_data, ["feminine", "masculine"]
+            )  # TODO: what if both?
+            kwargs["number"] = detect_unique_word(
+                notes, ["singular", "plural"]
+            )  # TODO: what if both?
+            kwargs["definite"] = str(meaning.startswith("the "))
+
+        elif "verb" in word_data.split():
+            kwargs["part_of_speech"] = PartOfSpeech.VERB
+            kwargs["binyan"] = BINYAAN_MAP.get(
+                word_data.split()[-1].upper().replace("'", "")
+            )
+            kwargs["tense"] = detect_unique_word(notes, ["past", "present", "future"])
+            kwargs["person"] = detect_unique_word(
+                notes, ["1st person", "2nd person", "3rd person"]
+            )
+            kwargs["gender"] = detect_unique_word(
+                notes, ["feminine", "masculine"]
+            )  # TODO: what if both?
+            kwargs["number"] = detect_unique_word(
+                notes, ["singular", "plural"]
+            )  # TODO: what if both?
+
+        word_cls = HEBREW_CLASS_MAP[kwargs["part_of_speech"]]
+        scraped.append(word_cls(**kwargs))
+
+    return scraped
+
+
+def check_parsed(query: str, containers: int, skipped: int) -> None:
+    # A page whose every result was skipped is broken, not a "not found"
+    if containers and skipped == containers:
+        raise ValueError(f"none of the {containers} search results for {query} parsed")
+
+
+def with_audio(
+    words: List[HebrewWord],
+    query: str,
+    lookup_audio: bool = True,
+    check_audio: bool = True,
+) -> List[HebrewWord]:
+    """
+    Fills in path_to_audio for parsed words. Kept out of parsing because
+    check_audio asks the operator about every clip.
+
+    """
+    return [
+        replace(
+            word,
+            path_to_audio=get_audio(
+                word.transliteration if word.transliteration else query,
+                manual_check=check_audio,
+                return_none=(not lookup_audio),
+            ),
+        )
+        for word in words
+    ]
+
+
+# Pulls every result and form in one WebDriver round trip. Missing elements come
+# back as null and are rejected in words_from_page_data, like NoSuchElementException.
+EXTRACT_SEARCH_RESULTS_JS = """
+const text = (el) => (el ? el.innerText.trim() : null);
+return Array.from(document.querySelectorAll('.verb-search-result')).map((c) => {
+  const data = c.querySelector('.verb-search-data');
+  const forms = c.querySelector('.verb-search-forms');
+  if (!data || !forms) return null;
+  return {
+    root: text(data.querySelector('.verb-search-root a')),
+    word_data: text(data.querySelector('.verb-search-binyan')),
+    forms: Array.from(forms.querySelectorAll('.vf-search-result')).map((r) => ({
+      menukad: text(r.querySelector('.menukad')),
+      transliteration: text(r.querySelector('.transcription')),
+      meaning: text(r.querySelector('.vf-search-meaning')),
+      notes: text(r.querySelector('.vf-search-tpgn')),
+    })),
+  };
+});
+"""
+
+
+def words_from_page_data(
+    query: str, containers: List[Optional[dict]]
+) -> List[HebrewWord]:
+    scraped = []
+    skipped = 0
+    for container in containers:
+        try:
+            if container is None or container["word_data"] is None:
+                raise ValueError("search result is missing its data section")
+
+            forms = []
+            for form in container["forms"]:
+                missing = [
+                    key
+                    for key in ("menukad", "transliteration", "meaning")
+                    if form[key] is None
+                ]
+                if missing:
+                    raise ValueError(f"form is missing {', '.join(missing)}")
+                notes = form["notes"]
+                forms.append({**form, "notes": notes.lower() if notes else None})
+
+            scraped += words_from_container(
+                query, container["root"], container["word_data"].lower(), forms
+            )
+
+        except Exception as e:
+            print("Skipping a container due to error:", e)
+            skipped += 1
+
+    check_parsed(query, len(containers), skipped)
+    return scraped
+
+
+def scrape_hebrew_word(
+    query: str,
+    driver: webdriver,
+    lookup_audio: bool = True,
+    extraction: str = "script",
+    check_audio: bool = True,
+) -> List[HebrewWord]:
+    """
+    extraction="script" reads the whole page with one execute_script call;
+    "elements" walks it with find_element, one round trip per lookup.
+
+    """
+    from selenium.common.exceptions import NoSuchElementException
+    from selenium.webdriver.common.by import By
+
+    url = f"{PEALIM_SEARCH_URL}?q={query}"
+    PEALIM_RATE_LIMITER.acquire()
+    with metrics.timer("pealim_page_load_seconds", engine="selenium"):
+        driver.get(url)
+
+    if extraction == "script":
+        with metrics.timer("pealim_parse_seconds", engine="selenium"):
+            containers = driver.execute_script(EXTRACT_SEARCH_RESULTS_JS)
+            PEALIM_RATE_LIMITER.report(empty=not containers)
+            scraped = words_from_page_data(query, containers)
+        return with_audio(scraped, query, lookup_audio, check_audio)
+
+    parse_start = time.perf_counter()
+    scraped = []
+    skipped = 0
     containers = driver.find_elements(By.CSS_SELECTOR, ".verb-search-result")
+    PEALIM_RATE_LIMITER.report(empty=not containers)
 
     for container in containers:
         try:
@@ -50,30 +260,8 @@ def scrape_hebrew_word(
                 .lower()
             )
 
-            results = forms.find_elements(By.CSS_SELECTOR, ".vf-search-result")
-            for result in results:
-                kwargs = {
-                    "word": query,
-                    "root": root,
-                    "part_of_speech": PartOfSpeech.WORD,
-                }
-
-                menukad = result.find_element(By.CSS_SELECTOR, ".menukad").text.strip()
-                kwargs["menukad"] = menukad
-                transliteration = result.find_element(
-                    By.CSS_SELECTOR, ".transcription"
-                ).text.strip()
-                kwargs["transliteration"] = transliteration
-                meaning = result.find_element(
-                    By.CSS_SELECTOR, ".vf-search-meaning"
-                ).text.strip()
-                kwargs["meaning"] = meaning
-                path_to_audio = get_audio(
-                    transliteration if transliteration else query,
-                    return_none=(not lookup_audio),
-                )
-                kwargs["path_to_audio"] = path_to_audio
-
+            extracted = []
+            for result in forms.find_elements(By.CSS_SELECTOR, ".vf-search-result"):
                 try:
                     notes = (
                         result.find_element(By.CSS_SELECTOR, ".vf-search-tpgn")
@@ -83,54 +271,176 @@ def scrape_hebrew_word(
                 except NoSuchElementException:
                     notes = None
 
-                if "noun" in word_data.split():
-                    kwargs["part_of_speech"] = PartOfSpeech.NOUN
-                    kwargs["gender"] = detect_unique_word(
-                        word_data, ["feminine", "masculine"]
-                    )  # TODO: what if both?
-                    kwargs["number"] = detect_unique_word(
-                        notes, ["singular", "plural"]
-                    )  # TODO: what if both?
-                    kwargs["definite"] = str(meaning.startswith("the "))
-
-                elif "verb" in word_data.split():
-                    kwargs["part_of_speech"] = PartOfSpeech.VERB
-                    kwargs["binyan"] = BINYAAN_MAP.get(
-                        word_data.split()[-1].upper().replace("'", "")
-                    )
-                    kwargs["tense"] = detect_unique_word(
-                        notes, ["past", "present", "future"]
-                    )
-                    kwargs["person"] = detect_unique_word(
-                        notes, ["1st person", "2nd person", "3rd person"]
-                    )
-                    kwargs["gender"] = detect_unique_word(
-                        notes, ["feminine", "masculine"]
-                    )  # TODO: what if both?
-                    kwargs["number"] = detect_unique_word(
-                        notes, ["singular", "plural"]
-                    )  # TODO: what if both?
+                extracted.append(
+                    {
+                        "menukad": result.find_element(
+                            By.CSS_SELECTOR, ".menukad"
+                        ).text.strip(),
+                        "transliteration": result.find_element(
+                            By.CSS_SELECTOR, ".transcription"
+                        ).text.strip(),
+                        "meaning": result.find_element(
+                            By.CSS_SELECTOR, ".vf-search-meaning"
+                        ).text.strip(),
+                        "notes": notes,
+                    }
+                )
 
-                word_cls = HEBREW_CLASS_MAP[kwargs["part_of_speech"]]
-                scraped.append(word_cls(**kwargs))
+            scraped += words_from_container(query, root, word_data, extracted)
 
         except Exception as e:
             print("Skipping a container due to error:", e)
+            skipped += 1
+
+    check_parsed(query, len(containers), skipped)
+    metrics.observe(
+        "pealim_parse_seconds", time.perf_counter() - parse_start, engine="selenium"
+    )
+    return with_audio(scraped, query, lookup_audio, check_audio)
+
+
+def get_http_session(pool_size: int = 4) -> requests.Session:
+    """A keep-alive session for the "http" engine; reuse it across lookups."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
 
+def _element_text(element) -> str:
+    return element.get_text().strip()
+
+
+def parse_search_page(html: str, query: str) -> List[HebrewWord]:
+    """Same selectors as scrape_hebrew_word, read from static HTML, without audio."""
+    soup = bs4.BeautifulSoup(html, "html.parser")
+
+    scraped = []
+    skipped = 0
+    containers = soup.select(".verb-search-result")
+    for container in containers:
+        try:
+            data = container.select_one(".verb-search-data")
+            forms = container.select_one(".verb-search-forms")
+
+            root_el = data.select_one(".verb-search-root a")
+            root = _element_text(root_el) if root_el else None
+            word_data = _element_text(data.select_one(".verb-search-binyan")).lower()
+
+            extracted = []
+            for result in forms.select(".vf-search-result"):
+                notes_el = result.select_one(".vf-search-tpgn")
+                extracted.append(
+                    {
+                        "menukad": _element_text(result.select_one(".menukad")),
+                        "transliteration": _element_text(
+                            result.select_one(".transcription")
+                        ),
+                        "meaning": _element_text(
+                            result.select_one(".vf-search-meaning")
+                        ),
+                        "notes": _element_text(notes_el).lower() if notes_el else None,
+                    }
+                )
+
+            scraped += words_from_container(query, root, word_data, extracted)
+
+        except Exception as e:
+            print("Skipping a container due to error:", e)
+            skipped += 1
+
+    check_parsed(query, len(containers), skipped)
     return scraped
 
 
+def scrape_hebrew_word_http(
+    query: str,
+    session: requests.Session,
+    lookup_audio: bool = True,
+    base_url: Optional[str] = None,
+    check_audio: bool = True,
+) -> List[HebrewWord]:
+    base_url = base_url or PEALIM_SEARCH_URL
+    for attempt in range(HTTP_RETRIES):
+        PEALIM_RATE_LIMITER.acquire()
+        with metrics.timer("pealim_page_load_seconds", engine="http"):
+            response = session.get(base_url, params={"q": query}, timeout=HTTP_TIMEOUT)
+        if response.status_code == 429 or response.status_code >= 500:
+            retry_after = response.headers.get("Retry-After")
+            PEALIM_RATE_LIMITER.report(
+                response.status_code,
+                retry_after=(
+                    float(retry_after)
+                    if retry_after and retry_after.isdigit()
+                    else None
+                ),
+            )
+            continue
+        break
+    response.raise_for_status()
+    PEALIM_RATE_LIMITER.report(
+        response.status_code, empty="verb-search-result" not in response.text
+    )
+
+    with metrics.timer("pealim_parse_seconds", engine="http"):
+        scraped = parse_search_page(response.text, query)
+    return with_audio(scraped, query, lookup_audio, check_audio)
+
+
+# engine name -> scraper; the driver passed along is a WebDriver or a requests.Session
+SCRAPERS = {
+    "selenium": scrape_hebrew_word,
+    "http": scrape_hebrew_word_http,
+}
+
+
 def lookup_hebrew_word(
-    query: str, driver: webdriver, lookup_audio: bool = True
+    query: str,
+    driver: webdriver,
+    lookup_audio: bool = True,
+    miss_ttl: float = NEGATIVE_CACHE_TTL,
+    engine: str = "selenium",
+    check_audio: bool = True,
+    use_lexicon: bool = True,
 ) -> List[HebrewWord]:
+    """
+    Cache first, then the offline lexicon, then pealim. Lexicon entries only
+    stand in for pealim when every one has a part of speech; bare ones (just a
+    meaning) are returned only if pealim has nothing. Lexicon entries are never
+    written to the cache, so they can't shadow a later scrape; pealim hits are.
+    A scrape that finds nothing is remembered for miss_ttl seconds so the same
+    dead variation isn't fetched again (0 disables), unless the rate limiter is
+    backing off at the time.
+    engine picks the scraper from SCRAPERS; driver must match it.
+
+    """
     lookup = check_cache(query)
 
     if len(lookup) > 0:
         return lookup
 
-    scraped = scrape_hebrew_word(query, driver, lookup_audio=lookup_audio)
-    write_cache(scraped)
+    entries = lookup_lexicon(query) if use_lexicon else []
+    if entries and all(e.part_of_speech is not PartOfSpeech.WORD for e in entries):
+        return with_audio(entries, query, lookup_audio, check_audio)
 
+    if miss_ttl and is_known_miss(query, ttl=miss_ttl):
+        scraped = []
+    else:
+        scraped = SCRAPERS[engine](
+            query, driver, lookup_audio=lookup_audio, check_audio=check_audio
+        )
+        if scraped:
+            write_cache(scraped)
+        elif not PEALIM_RATE_LIMITER.backing_off:
+            # Empty pages while throttled say nothing about the word
+            record_miss(query)
+
+    if not scraped and entries:
+        return with_audio(entries, query, lookup_audio, check_audio)
     return scraped
 
 
@@ -182,72 +492,337 @@ def clean_word_preserving_internals(word: str) -> str:
 
 
 def get_list_of_words(text: str | List[str]) -> List[str]:
-    if type(text) is List:
+    if isinstance(text, list):
         return text
-    elif type(text) is str:
-        return [
-            clean_word
-            for word in text.split()
-            if (clean_word := clean_word_preserving_internals(word))
-        ]
+    elif isinstance(text, str):
+        return list(iter_tokens([text]))
     else:
         raise TypeError(f"{text} is not a string or list of words")
 
 
-def translate_text(
-    text: str | List[str], driver: webdriver, lookup_audio: bool = True
-) -> List[HebrewWord]:
-    selected = []
-    words = get_list_of_words(text)
-    failed_words = []
+READ_CHUNK_SIZE = 1 << 16
+
+
+def _clean_words(words: Iterable[str]) -> Iterator[str]:
     for word in words:
-        try:
-            print(f"\nLooking up: {word}")
+        if clean_word := clean_word_preserving_internals(word):
+            yield clean_word
+
+
+def _iter_file_tokens(path: str) -> Iterator[str]:
+    carry = ""
+    with open(path, encoding="utf-8") as f:
+        while chunk := f.read(READ_CHUNK_SIZE):
+            pieces = (carry + chunk).split()
+            # The last word may continue in the next chunk
+            carry = pieces.pop() if pieces and not chunk[-1].isspace() else ""
+            yield from _clean_words(pieces)
+    yield from _clean_words([carry])
+
+
+def iter_tokens(source: str | Iterable[str]) -> Iterator[str]:
+    """
+    Cleaned words, one at a time, from a text file path (read in fixed-size
+    chunks) or from an iterable of lines, so memory doesn't grow with the text.
+
+    """
+    if isinstance(source, str):
+        yield from _iter_file_tokens(source)
+    else:
+        for line in source:
+            yield from _clean_words(line.split())
+
+
+def count_tokens(source: str | Iterable[str]) -> Counter:
+    return Counter(iter_tokens(source))
 
-            for word_variation in find_variations(word):
-                options: List[HebrewWord] = lookup_hebrew_word(
-                    word_variation, driver, lookup_audio=lookup_audio
-                )
-                if options:
-                    break
 
-            if not options:
-                print("No meanings found.")
+def find_options(
+    word: str,
+    driver: webdriver,
+    lookup_audio: bool = True,
+    engine: str = "selenium",
+    check_audio: bool = True,
+) -> List[HebrewWord]:
+    """Options for the first variation of word that has any."""
+    options = []
+    tried = 0
+    for word_variation in find_variations(word):
+        tried += 1
+        options = lookup_hebrew_word(
+            word_variation,
+            driver,
+            lookup_audio=lookup_audio,
+            engine=engine,
+            check_audio=check_audio,
+        )
+        if options:
+            break
+    metrics.observe("variations_tried_per_token", tried, found=bool(options))
+    return options
+
+
+def first_options(pending: List[Future]) -> List[HebrewWord]:
+    """Waits on variation lookups in likelihood order and keeps the first hit."""
+    for tried, future in enumerate(pending, 1):
+        options = future.result()
+        if options:
+            metrics.observe("variations_tried_per_token", tried, found=True)
+            return options
+    metrics.observe("variations_tried_per_token", len(pending), found=False)
+    return []
+
+
+class ScraperPool:
+    """
+    Looks words up on several drivers (or HTTP sessions for engine="http") at
+    once. Each lookup borrows one client, so a client is never shared between
+    threads. Audio URLs are kept without asking, since prompts can't interleave.
+    While the pool is open, cache writes are batched (see batched_writes).
+
+    """
+
+    def __init__(
+        self,
+        clients: List,
+        engine: str = "selenium",
+        lookup_audio: bool = True,
+        prefetch: int = 32,
+    ):
+        self.engine = engine
+        self.lookup_audio = lookup_audio
+        self.prefetch = prefetch
+        self._clients = queue.Queue()
+        for client in clients:
+            self._clients.put(client)
+        self._executor = ThreadPoolExecutor(max_workers=len(clients))
+        self._submitted: dict[str, Future] = {}
+        self._needed_by: Counter = Counter()  # query -> words in the window using it
+        self._writes = batched_writes()
+        self._writes.__enter__()
+
+    def _lookup(self, query: str) -> List[HebrewWord]:
+        client = self._clients.get()
+        try:
+            return lookup_hebrew_word(
+                query,
+                client,
+                lookup_audio=self.lookup_audio,
+                engine=self.engine,
+                check_audio=False,
+            )
+        finally:
+            self._clients.put(client)
+
+    def lookup(self, query: str) -> Future:
+        """
+        Each distinct query is fetched once however many words share it, as long
+        as one of them is still in resolve's window.
+
+        """
+        if query not in self._submitted:
+            self._submitted[query] = self._executor.submit(self._lookup, query)
+        return self._submitted[query]
+
+    def resolve(self, words: Iterable[str]) -> Iterator[Tuple[str, List[Future]]]:
+        """
+        Yields (word, variation lookups) in input order, keeping up to prefetch
+        words in flight ahead of the consumer. Pass the futures to first_options.
+
+        """
+        window = deque()
+        for word in words:
+            variations = find_variations(word)
+            self._needed_by.update(variations)
+            window.append((word, variations, [self.lookup(v) for v in variations]))
+            if len(window) > self.prefetch:
+                yield self._leave(*window.popleft())
+        while window:
+            yield self._leave(*window.popleft())
+
+    def _leave(
+        self, word: str, variations: List[str], futures: List[Future]
+    ) -> Tuple[str, List[Future]]:
+        # The consumer keeps the futures; the pool forgets them once no word
+        # in the window needs them, so memory stays flat over a whole corpus
+        self._needed_by.subtract(variations)
+        for variation in variations:
+            if self._needed_by[variation] <= 0:
+                del self._needed_by[variation]
+                self._submitted.pop(variation, None)
+        return word, futures
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._submitted.clear()
+        self._needed_by.clear()
+        if self._writes is not None:
+            self._writes.__exit__(None, None, None)
+            self._writes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def choose_option(
+    word: str, options: List[HebrewWord], lookup_audio: bool = True
+) -> Optional[HebrewWord]:
+    if not options:
+        print("No meanings found.")
+        manual_input = yes_or_no_input("Enter manually?")
+        return (
+            manually_create_word(word, lookup_audio=lookup_audio)
+            if manual_input
+            else None
+        )
+
+    for i, option in enumerate(options):
+        print(
+            f"{i}: {option.menukad or option.word} — {option.meaning or 'No meaning provided'}"
+        )
+
+    while True:
+        try:
+            index = input(
+                f"Select meaning for '{word}' (0-{len(options) - 1}): "
+            ).strip()
+            if index.lower() == "skip":
                 manual_input = yes_or_no_input("Enter manually?")
-                manual = (
+                return (
                     manually_create_word(word, lookup_audio=lookup_audio)
                     if manual_input
                     else None
                 )
-                selected.append(manual)
-                continue
-
-            for i, option in enumerate(options):
-                print(
-                    f"{i}: {option.menukad or option.word} — {option.meaning or 'No meaning provided'}"
-                )
+            return options[int(index)]
+        except (ValueError, IndexError):
+            print("Invalid input. Please enter a valid index or 'skip' to skip.")
+
+
+def iter_translations(
+    words: Iterable[str],
+    driver: webdriver,
+    lookup_audio: bool = True,
+    engine: str = "selenium",
+    pool: Optional[ScraperPool] = None,
+    choose: Optional[Callable[[str, List[HebrewWord]], Optional[HebrewWord]]] = None,
+    check_audio: bool = True,
+    recall: bool = True,
+    remember: bool = True,
+) -> Iterator[Tuple[str, Optional[HebrewWord], bool]]:
+    """
+    Yields (word, chosen meaning or None, succeeded) for each word in order.
+    choose defaults to prompting with choose_option; see selection.py for
+    headless choosers, which should be paired with check_audio=False.
+    With recall, a word whose earlier choice is still among its options is
+    resolved without asking; with remember, new choices are stored for that.
+
+    """
+    choose = choose or partial(choose_option, lookup_audio=lookup_audio)
+    lookups = pool.resolve(words) if pool else ((word, None) for word in words)
+    for word, pending in lookups:
+        try:
+            print(f"\nLooking up: {word}")
 
-            while True:
-                try:
-                    index = input(
-                        f"Select meaning for '{word}' (0-{len(options) - 1}): "
-                    ).strip()
-                    if index.lower() == "skip":
-                        manual_input = yes_or_no_input("Enter manually?")
-                        manual = (
-                            manually_create_word(word, lookup_audio=lookup_audio)
-                            if manual_input
-                            else None
-                        )
-                        selected.append(manual)
-                        break
-                    selected.append(options[int(index)])
-                    break
-                except (ValueError, IndexError):
-                    print(
-                        "Invalid input. Please enter a valid index or 'skip' to skip."
+            with profiling.stage("lookup"):
+                options: List[HebrewWord] = (
+                    first_options(pending)
+                    if pending is not None
+                    else find_options(
+                        word,
+                        driver,
+                        lookup_audio=lookup_audio,
+                        engine=engine,
+                        check_audio=check_audio,
                     )
+                )
+                choice = recall_selection(word, options) if recall else None
+            if choice is None:
+                with profiling.stage("choose"):
+                    choice = choose(word, options)
+                if remember and choice is not None:
+                    record_selection(word, choice)
+            yield word, choice, True
         except Exception:
+            yield word, None, False
+
+
+def translate_text(
+    text: str | List[str],
+    driver: webdriver,
+    lookup_audio: bool = True,
+    engine: str = "selenium",
+    pool: Optional[ScraperPool] = None,
+    reselect: bool = False,
+) -> List[HebrewWord]:
+    """
+    With a pool, lookups for upcoming words run in the background while the
+    current one is being chosen; driver is then unused and may be None.
+    Words chosen on earlier runs are reused unless reselect is set.
+
+    """
+    selected = []
+    failed_words = []
+    for word, choice, ok in iter_translations(
+        get_list_of_words(text),
+        driver,
+        lookup_audio,
+        engine,
+        pool,
+        recall=not reselect,
+    ):
+        if ok:
+            selected.append(choice)
+        else:
             failed_words.append(word)
 
     return selected, failed_words
+
+
+def translate_corpus(
+    source: str | Iterable[str],
+    driver: webdriver,
+    lookup_audio: bool = True,
+    engine: str = "selenium",
+    pool: Optional[ScraperPool] = None,
+    reselect: bool = False,
+) -> Tuple[Dict[str, Optional[HebrewWord]], Counter, List[str]]:
+    """
+    Streaming translate_text for whole books: source is a file path or an
+    iterable of lines. Tokens are counted in one lazy pass and each distinct
+    token is resolved once, most frequent first, with cache writes batched.
+    Returns the choice per token, the token counts and the tokens that failed;
+    iter_occurrences maps the choices back onto the text.
+
+    """
+    with profiling.stage("tokenize"):
+        counts = count_tokens(source)
+    print(f"{sum(counts.values())} tokens, {len(counts)} distinct")
+
+    selections = {}
+    failed_words = []
+    with batched_writes():
+        for word, choice, ok in iter_translations(
+            (word for word, _ in counts.most_common()),
+            driver,
+            lookup_audio,
+            engine,
+            pool,
+            recall=not reselect,
+        ):
+            if ok:
+                selections[word] = choice
+            else:
+                failed_words.append(word)
+
+    return selections, counts, failed_words
+
+
+def iter_occurrences(
+    source: str | Iterable[str], selections: Dict[str, Optional[HebrewWord]]
+) -> Iterator[Tuple[str, Optional[HebrewWord]]]:
+    """(token, chosen meaning) for every token of source, in text order."""
+    for token in iter_tokens(source):
+        yield token, selections.get(token)
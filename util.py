@@ -1,3 +1,6 @@
+import importlib.util
+import sys
+from types import ModuleType
 from typing import List
 from itertools import chain, combinations
 
@@ -6,6 +9,28 @@ def yes_or_no_input(question: str) -> bool:
     return int(input(f"{question} (0 = yes, 1 = no)").strip()) == 0
 
 
+class _LazyModule(ModuleType):
+    def __getattr__(self, attr: str):
+        # import_module holds the import lock, so racing threads load it once
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns a stand-in for module name that imports it on first attribute
+    access. Meant for heavy top-level packages (pandas, requests, bs4) that
+    most commands never touch.
+
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    return _LazyModule(name)
+
+
 def remove_duplicates(seq) -> List:
     seen = set()
     seen_add = seen.add
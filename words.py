@@ -1,7 +1,8 @@
+import sys
 from enum import Enum
 from util import remove_duplicates
 from dataclasses import asdict, dataclass, fields
-from typing import Optional, Literal, List, Type
+from typing import ClassVar, Optional, Literal, List, Type
 
 
 class Language(Enum):
@@ -20,14 +21,26 @@ class PartOfSpeech(Enum):
 POS_MAP = {pos.value: pos for pos in PartOfSpeech}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Word:
     word: str
     meaning: str
 
 
-# Shared base class for all words
-@dataclass(frozen=True)
+# Grammatical values repeat across most words; one shared copy of each string
+INTERNED_FIELDS = ("root", "gender", "number", "definite", "tense", "person")
+
+
+def intern_fields(word: "HebrewWord") -> None:
+    for name in INTERNED_FIELDS:
+        value = getattr(word, name, None)
+        if type(value) is str:
+            object.__setattr__(word, name, sys.intern(value))
+
+
+# Shared base class for all words. Slotted, so no per-instance __dict__;
+# language is the same for every instance and lives on the class.
+@dataclass(frozen=True, slots=True)
 class HebrewWord(Word):
     word: str
     transliteration: Optional[str] = None
@@ -37,28 +50,32 @@ class HebrewWord(Word):
     root: Optional[str] = None
     path_to_audio: Optional[str] = None  # ← NEW
 
+    language: ClassVar[Language] = Language.HEBREW
+
     def __post_init__(self):
-        object.__setattr__(self, "language", Language.HEBREW)
+        intern_fields(self)
 
 
 # Nouns and adjectives may have gender and number
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HebrewNoun(HebrewWord):
     gender: Optional[Literal["masculine", "feminine", "masculine and feminine"]] = None
     number: Optional[Literal["singular", "plural", "singular and plural"]] = None
     definite: Optional[Literal["True", "False"]] = None  # Definite (with "ha-")?
 
     def __post_init__(self):
+        intern_fields(self)
         object.__setattr__(self, "part_of_speech", PartOfSpeech.NOUN)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HebrewAdjective(HebrewWord):
     gender: Optional[Literal["masculine", "feminine", "masculine and feminine"]] = None
     number: Optional[Literal["singular", "plural", "singular and plural"]] = None
     # agrees_with: Optional[str] = None  # Refers to the noun it modifies
 
     def __post_init__(self):
+        intern_fields(self)
         object.__setattr__(self, "part_of_speech", PartOfSpeech.ADJECTIVE)
 
 
@@ -76,7 +93,7 @@ BINYAAN_MAP = {b.value: b for b in Binyaan}
 
 
 # Verbs have more grammatical info
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HebrewVerb(HebrewWord):
     binyan: Optional[Binyaan] = None  # e.g., Pa'al, Pi'el, Hif'il
     tense: Optional[Literal["past", "present", "future", "imperative"]] = None
@@ -85,22 +102,25 @@ class HebrewVerb(HebrewWord):
     number: Optional[Literal["singular", "plural"]] = None
 
     def __post_init__(self):
+        intern_fields(self)
         object.__setattr__(self, "part_of_speech", PartOfSpeech.VERB)
 
 
 # Others
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HebrewPreposition(HebrewWord):
     # Usually invariant, but might have contractions (like "ba")
     # formality: Optional[Literal["formal", "colloquial"]] = None
 
     def __post_init__(self):
+        intern_fields(self)
         object.__setattr__(self, "part_of_speech", PartOfSpeech.PREPOSITION)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class HebrewAdverb(HebrewWord):
     def __post_init__(self):
+        intern_fields(self)
         object.__setattr__(self, "part_of_speech", PartOfSpeech.ADVERB)
 
 